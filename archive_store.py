@@ -0,0 +1,518 @@
+"""Columnar, date-partitioned Parquet archive store.
+
+Each run is written to ``<archive dir>/date=YYYY-MM-DD/articles.parquet``
+with a fixed schema. Readers prune partitions by date, project columns and
+push source filters down into Parquet, reading one partition at a time.
+Per-day CSV archives written before the store existed are still read
+(for dates without a Parquet partition) until they are migrated.
+
+Compaction merges the daily partitions of each completed week or month
+into a de-duplicated ``segment=<first day>_<last day>`` directory, and a
+retention policy deletes partitions past a configurable age.
+"""
+
+import logging
+import os
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, Generator, List, Tuple
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from helper_functions import ARTICLE_COLUMNS, canonicalize_url
+
+logger = logging.getLogger(__name__)
+
+# Constants
+ARCHIVE_DIRS = {
+    "all_articles": Path("archives_all_articles"),
+    "top_articles": Path("archives_top_articles"),
+}
+PARTITION_PREFIX = "date="
+SEGMENT_PREFIX = "segment="
+COMPACTION_PERIODS = ("week", "month")
+DEFAULT_RETENTION_DAYS = {"all_articles": None, "top_articles": None}
+PARTITION_FILE = "articles.parquet"
+PARQUET_COMPRESSION = "zstd"
+PUBLISHED_AT_FORMAT = "%Y-%m-%dT%H:%M:%SZ"
+GDELT_SEENDATE_FORMAT = "%Y%m%dT%H%M%SZ"
+
+ARTICLE_SCHEMA = pa.schema(
+    [
+        ("source", pa.dictionary(pa.int32(), pa.string())),
+        ("title", pa.string()),
+        ("url", pa.string()),
+        ("published_at", pa.timestamp("us", tz="UTC")),
+        ("description", pa.string()),
+        ("content", pa.string()),
+        ("fetched_from", pa.dictionary(pa.int8(), pa.string())),
+        ("archive_date", pa.date32()),
+    ]
+)
+SCHEMAS = {
+    "all_articles": ARTICLE_SCHEMA,
+    "top_articles": pa.schema(
+        list(ARTICLE_SCHEMA)
+        + [
+            ("relevance_score", pa.float64()),
+            ("summary", pa.string()),
+            ("topic", pa.string()),
+        ]
+    ),
+}
+
+
+def _archive_dir(kind: str) -> Path:
+    """Return the directory of an archive kind."""
+    if kind not in ARCHIVE_DIRS:
+        raise ValueError(
+            f"Unknown archive kind: {kind}. Use one of {list(ARCHIVE_DIRS)}"
+        )
+
+    return ARCHIVE_DIRS[kind]
+
+
+def _to_table(df: pd.DataFrame, kind: str, archive_date: date) -> pa.Table:
+    """Convert a pipeline DataFrame to an Arrow table with the stable schema."""
+    schema = SCHEMAS[kind]
+    frame = pd.DataFrame(index=df.index)
+
+    for field in schema:
+        if field.name == "archive_date":
+            frame[field.name] = archive_date
+        elif field.name == "published_at":
+            frame[field.name] = df.get(
+                "published_at_parsed",
+                pd.to_datetime(df["published_at"], errors="coerce", utc=True),
+            )
+        elif field.name not in df:
+            # Columns added to the schema later are empty in older archives
+            frame[field.name] = None
+        elif pa.types.is_floating(field.type):
+            frame[field.name] = df[field.name].astype("float64")
+        else:
+            frame[field.name] = df[field.name].astype("object").fillna("").astype(str)
+
+    return pa.Table.from_pandas(frame, schema=schema, preserve_index=False)
+
+
+def write_articles(df: pd.DataFrame, kind: str, archive_date: date) -> Path:
+    """Write one run's articles as a compressed Parquet partition.
+
+    Helper columns such as 'combined_text' and 'published_at_parsed' are not
+    stored; an existing partition for the same date is replaced.
+
+    Args:
+        df: Articles to archive
+        kind: 'all_articles' or 'top_articles'
+        archive_date: Date of the run
+
+    Returns:
+        Path of the written Parquet file
+    """
+    partition = _archive_dir(kind) / f"{PARTITION_PREFIX}{archive_date.isoformat()}"
+
+    return _write_table(_to_table(df, kind, archive_date), partition)
+
+
+def _write_table(table: pa.Table, partition: Path) -> Path:
+    """Write an Arrow table as the Parquet file of a partition directory.
+
+    The table is written to a temporary file that then replaces the
+    partition file, so a failed write never leaves a truncated partition.
+    """
+    partition.mkdir(parents=True, exist_ok=True)
+
+    path = partition / PARTITION_FILE
+    tmp_path = partition / f".{PARTITION_FILE}.tmp"
+    try:
+        pq.write_table(table, tmp_path, compression=PARQUET_COMPRESSION)
+        os.replace(tmp_path, path)
+    finally:
+        tmp_path.unlink(missing_ok=True)
+
+    return path
+
+
+def _read_legacy_csv(path: Path, kind: str, archive_date: date) -> pd.DataFrame:
+    """Read a legacy per-day CSV archive into the store's column layout.
+
+    GDELT rows in older archives have an empty 'published_at' but keep the
+    seen date in 'content', which is used instead.
+    """
+    columns = [field.name for field in SCHEMAS[kind] if field.name != "archive_date"]
+    raw = pd.read_csv(path, dtype=str, usecols=lambda c: c in columns).fillna("")
+
+    published = pd.to_datetime(raw["published_at"], errors="coerce", utc=True)
+    gdelt_seen = pd.to_datetime(
+        raw["content"].where(raw["fetched_from"] == "gdelt"),
+        format=GDELT_SEENDATE_FORMAT,
+        errors="coerce",
+        utc=True,
+    )
+    raw["published_at_parsed"] = published.fillna(gdelt_seen)
+
+    if "relevance_score" in raw:
+        raw["relevance_score"] = pd.to_numeric(raw["relevance_score"], errors="coerce")
+
+    return _to_table(raw, kind, archive_date).to_pandas()
+
+
+def _partition_range(kind: str, path: Path) -> Tuple[date, date] | None:
+    """Return the first and last archive date covered by a partition path."""
+    try:
+        if path.suffix == ".csv":
+            day = date.fromisoformat(path.stem.removeprefix(f"{kind}_"))
+            return day, day
+
+        name = path.parent.name
+        if name.startswith(PARTITION_PREFIX):
+            day = date.fromisoformat(name.removeprefix(PARTITION_PREFIX))
+            return day, day
+
+        first, last = name.removeprefix(SEGMENT_PREFIX).split("_")
+        return date.fromisoformat(first), date.fromisoformat(last)
+
+    except ValueError:
+        return None
+
+
+def list_partitions(kind: str) -> List[Tuple[date, date, Path]]:
+    """List the archived runs and compacted segments of a kind, oldest first.
+
+    Daily Parquet partitions and compacted segments take precedence over
+    legacy CSVs for the dates they cover.
+
+    Args:
+        kind: 'all_articles' or 'top_articles'
+
+    Returns:
+        List of (first archive date, last archive date, path) tuples
+    """
+    archive_dir = _archive_dir(kind)
+    partitions: Dict[Tuple[date, date], Path] = {}
+
+    for pattern in (
+        f"{kind}_*.csv",
+        f"{PARTITION_PREFIX}*/{PARTITION_FILE}",
+        f"{SEGMENT_PREFIX}*/{PARTITION_FILE}",
+    ):
+        for path in archive_dir.glob(pattern):
+            date_range = _partition_range(kind, path)
+            if date_range is not None:
+                partitions[date_range] = path
+
+    # Drop CSVs whose day is already held by a Parquet partition or segment
+    parquet_ranges = [r for r, path in partitions.items() if path.suffix != ".csv"]
+    partitions = {
+        (first, last): path
+        for (first, last), path in partitions.items()
+        if path.suffix != ".csv"
+        or not any(start <= first <= end for start, end in parquet_ranges)
+    }
+
+    return [(first, last, path) for (first, last), path in sorted(partitions.items())]
+
+
+def read_partition(
+    kind: str,
+    path: Path,
+    start_date: date | None = None,
+    end_date: date | None = None,
+    sources: List[str] | None = None,
+    columns: List[str] | None = None,
+) -> pd.DataFrame:
+    """Read one partition or segment, pushing filters down into Parquet.
+
+    Takes the same filter arguments as iter_article_batches.
+
+    Returns:
+        DataFrame of the matching rows
+    """
+    if columns is not None and "archive_date" not in columns:
+        columns = columns + ["archive_date"]
+
+    if path.suffix == ".parquet":
+        filters = []
+        if sources:
+            filters.append(("fetched_from", "in", sources))
+        if start_date is not None:
+            filters.append(("archive_date", ">=", start_date))
+        if end_date is not None:
+            filters.append(("archive_date", "<=", end_date))
+
+        # Columns added to the schema later are missing from older files
+        stored = pq.read_schema(path).names
+        wanted = columns or SCHEMAS[kind].names
+        batch = pq.read_table(
+            path,
+            columns=[column for column in wanted if column in stored],
+            filters=filters or None,
+            partitioning=None,
+        ).to_pandas()
+
+        return batch.reindex(columns=wanted)
+
+    archive_date, _ = _partition_range(kind, path)
+    batch = _read_legacy_csv(path, kind, archive_date)
+    if sources:
+        batch = batch[batch["fetched_from"].isin(sources)]
+    if columns is not None:
+        batch = batch[columns]
+
+    return batch
+
+
+def iter_article_batches(
+    kind: str,
+    start_date: date | None = None,
+    end_date: date | None = None,
+    sources: List[str] | None = None,
+    columns: List[str] | None = None,
+) -> Generator[pd.DataFrame, None, None]:
+    """Lazily read archived articles, one partition or segment at a time.
+
+    Args:
+        kind: 'all_articles' or 'top_articles'
+        start_date: First archive date to read (inclusive)
+        end_date: Last archive date to read (inclusive)
+        sources: Only keep rows whose 'fetched_from' is in this list
+        columns: Columns to read ('archive_date' is always included)
+
+    Yields:
+        DataFrame of the matching rows of each partition
+    """
+    for first, last, path in list_partitions(kind):
+        if start_date is not None and last < start_date:
+            continue
+        if end_date is not None and first > end_date:
+            continue
+
+        batch = read_partition(kind, path, start_date, end_date, sources, columns)
+
+        if not batch.empty:
+            yield batch
+
+
+def load_articles(
+    kind: str,
+    start_date: date | None = None,
+    end_date: date | None = None,
+    sources: List[str] | None = None,
+    columns: List[str] | None = None,
+) -> pd.DataFrame:
+    """Read archived articles into one DataFrame.
+
+    Takes the same arguments as iter_article_batches.
+
+    Returns:
+        Concatenated matching rows (empty if nothing matches)
+    """
+    batches = list(iter_article_batches(kind, start_date, end_date, sources, columns))
+
+    if not batches:
+        return pd.DataFrame(columns=columns or SCHEMAS[kind].names)
+
+    return pd.concat(batches, ignore_index=True)
+
+
+def to_article_records(df: pd.DataFrame) -> List[Dict[str, Any]]:
+    """Convert archived rows back to normalized article dictionaries.
+
+    Args:
+        df: Rows read from the store
+
+    Returns:
+        Article dictionaries as produced by the fetchers
+    """
+    published_at = df["published_at"].dt.strftime(PUBLISHED_AT_FORMAT).fillna("")
+    records = df.assign(published_at=published_at)[ARTICLE_COLUMNS]
+
+    return records.astype(str).to_dict("records")
+
+
+def load_archived_articles(from_date: date, to_date: date) -> List[Dict[str, Any]]:
+    """Load previously archived articles that fall inside a date window.
+
+    Reads every run archived between from_date and to_date and keeps rows
+    published on or after from_date (rows without a timestamp are kept).
+
+    Args:
+        from_date: Start of the window
+        to_date: End of the window
+
+    Returns:
+        Archived articles as normalized article dictionaries
+    """
+    archived = load_articles("all_articles", from_date, to_date)
+    if archived.empty:
+        return []
+
+    window_start = pd.Timestamp(from_date, tz="UTC")
+    published = archived["published_at"]
+    archived = archived[published.isna() | (published >= window_start)]
+
+    return to_article_records(archived)
+
+
+def migrate_legacy_archives(remove_csv: bool = False) -> int:
+    """Convert legacy per-day CSV archives into Parquet partitions.
+
+    Args:
+        remove_csv: Delete each CSV once its partition has been written
+
+    Returns:
+        Number of CSV files migrated
+    """
+    migrated = 0
+
+    for kind in ARCHIVE_DIRS:
+        for archive_date, _, path in list_partitions(kind):
+            if path.suffix != ".csv":
+                continue
+
+            frame = _read_legacy_csv(path, kind, archive_date)
+            frame["published_at_parsed"] = frame["published_at"]
+            written = write_articles(frame, kind, archive_date)
+            logger.info(f"Migrated {path} -> {written}")
+
+            if remove_csv:
+                path.unlink()
+
+            migrated += 1
+
+    return migrated
+
+
+def _period_bounds(day: date, period: str) -> Tuple[date, date]:
+    """Return the first and last day of the week or month containing a day."""
+    if period == "week":
+        first = day - timedelta(days=day.weekday())
+        return first, first + timedelta(days=6)
+
+    if period == "month":
+        first = day.replace(day=1)
+        next_month = (first + timedelta(days=32)).replace(day=1)
+        return first, next_month - timedelta(days=1)
+
+    raise ValueError(f"Unknown compaction period: {period}. Use {COMPACTION_PERIODS}")
+
+
+def _remove_partition(path: Path) -> None:
+    """Delete a partition file and its directory once empty."""
+    path.unlink()
+
+    if path.parent.name.startswith((PARTITION_PREFIX, SEGMENT_PREFIX)) and not any(
+        path.parent.iterdir()
+    ):
+        path.parent.rmdir()
+
+
+def compact_archives(kind: str, period: str = "week", today: date | None = None) -> int:
+    """Merge the daily partitions of each completed period into one segment.
+
+    Segments are written to ``segment=<first day>_<last day>`` directories.
+    Rows of 'all_articles' are de-duplicated by canonical URL, keeping the
+    most recent archived copy, since overlapping run windows archive most
+    articles several times. Periods that are not over yet are left alone,
+    and late partitions are merged into their period's existing segment.
+    A segment spanning several periods (e.g. a week segment when compacting
+    by month) is split between them by archive date once all are over.
+
+    Args:
+        kind: 'all_articles' or 'top_articles'
+        period: 'week' (Monday to Sunday) or 'month'
+        today: Current date (defaults to today, UTC)
+
+    Returns:
+        Number of partitions merged into segments
+    """
+    today = today or datetime.now(timezone.utc).date()
+    schema = SCHEMAS[kind]
+    groups: Dict[Tuple[date, date], List[Path]] = {}
+    pending: Dict[Path, int] = {}
+
+    for first, last, path in list_partitions(kind):
+        periods = [_period_bounds(first, period)]
+        while periods[-1][1] < last:
+            periods.append(_period_bounds(periods[-1][1] + timedelta(days=1), period))
+
+        if periods[-1][1] < today:
+            for bounds in periods:
+                groups.setdefault(bounds, []).append(path)
+            pending[path] = len(periods)
+
+    merged = 0
+
+    for (first, last), paths in groups.items():
+        segment = _archive_dir(kind) / f"{SEGMENT_PREFIX}{first}_{last}"
+        if paths == [segment / PARTITION_FILE]:
+            continue
+
+        frame = pd.concat(
+            [read_partition(kind, path, first, last) for path in paths],
+            ignore_index=True,
+        ).sort_values(["archive_date", "published_at"], kind="stable")
+
+        if kind == "all_articles":
+            url_keys = frame["url"].map(canonicalize_url)
+            frame = frame[~url_keys.duplicated(keep="last")]
+        else:
+            frame = frame.drop_duplicates(subset=["url", "archive_date"])
+
+        table = pa.Table.from_pandas(
+            frame[schema.names], schema=schema, preserve_index=False
+        )
+        written = _write_table(table, segment)
+
+        # Only remove the sources once the segment is safely in place,
+        # including legacy CSVs that were shadowed by a Parquet partition;
+        # a split segment goes once every period holding its rows is written
+        shadowed_csvs = []
+        for path in _archive_dir(kind).glob(f"{kind}_*.csv"):
+            day_range = _partition_range(kind, path)
+            if path not in paths and day_range and first <= day_range[0] <= last:
+                shadowed_csvs.append(path)
+
+        for path in paths:
+            pending[path] -= 1
+            if pending[path] == 0 and path != written:
+                _remove_partition(path)
+
+        for path in shadowed_csvs:
+            _remove_partition(path)
+
+        logger.info(
+            f"Compacted {len(paths)} partitions into {written} ({len(frame)} rows)"
+        )
+        merged += len(paths)
+
+    return merged
+
+
+def apply_retention(kind: str, retention_days: int, today: date | None = None) -> int:
+    """Delete partitions and segments whose newest run is past the retention.
+
+    Args:
+        kind: 'all_articles' or 'top_articles'
+        retention_days: Number of days of archives to keep
+        today: Current date (defaults to today, UTC)
+
+    Returns:
+        Number of partitions deleted
+    """
+    today = today or datetime.now(timezone.utc).date()
+    cutoff = today - timedelta(days=retention_days)
+    removed = 0
+
+    for _, last, path in list_partitions(kind):
+        if last < cutoff:
+            _remove_partition(path)
+            removed += 1
+
+    if removed:
+        logger.info(f"Removed {removed} {kind} partitions archived before {cutoff}")
+
+    return removed
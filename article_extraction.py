@@ -0,0 +1,260 @@
+"""Full-text extraction for the ranked articles.
+
+NewsAPI truncates article content to about 200 characters and GDELT returns
+no body at all, so the pages of the top articles are downloaded and their
+main text is extracted before summarization. Pages are fetched concurrently
+with a per-domain concurrency and request-rate limit, and the raw HTML is
+kept in a compressed on-disk cache keyed by canonical URL, so reruns and
+overlapping windows download each page once.
+"""
+
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from html.parser import HTMLParser
+from pathlib import Path
+from typing import Dict, List, Tuple
+from urllib.parse import urlsplit
+
+import pandas as pd
+import requests
+
+from disk_cache import DEFAULT_CACHE_DIR, DiskCache
+from fetchers.http_transport import http_get
+from helper_functions import TokenBucket, canonicalize_url
+
+logger = logging.getLogger(__name__)
+
+# Constants
+PAGE_CACHE_PATH = DEFAULT_CACHE_DIR / "pages.sqlite"
+PAGE_CACHE_MAX_MB = 200
+DEFAULT_EXTRACTION_WORKERS = 8
+DEFAULT_PAGE_TIMEOUT = 10
+PAGE_MAX_RETRIES = 1
+NEGATIVE_CACHE_TTL_DAYS = 7
+TRANSIENT_CLIENT_ERRORS = {408, 429}
+MAX_PAGE_BYTES = 2 * 1024 * 1024
+PER_DOMAIN_CONCURRENCY = 2
+PER_DOMAIN_REQUESTS_PER_SECOND = 1.0
+MIN_PARAGRAPH_WORDS = 8
+MIN_EXTRACTED_CHARS = 400
+MAX_CONTENT_CHARS = 20_000
+USER_AGENT = "Mozilla/5.0 (compatible; ArchieDigest/1.0)"
+SKIPPED_TAGS = {
+    "script",
+    "style",
+    "noscript",
+    "nav",
+    "header",
+    "footer",
+    "aside",
+    "form",
+    "figure",
+    "svg",
+    "button",
+}
+BLOCK_TAGS = {"p", "h2", "h3", "li", "blockquote"}
+
+# Per-domain politeness limits shared by all extraction threads
+_domain_limits: Dict[str, Tuple[threading.Semaphore, TokenBucket]] = {}
+_domain_lock = threading.Lock()
+
+
+class _MainTextParser(HTMLParser):
+    """Collect the paragraphs of a page, remembering which were in <article>."""
+
+    def __init__(self) -> None:
+        super().__init__(convert_charrefs=True)
+        self.paragraphs: List[Tuple[str, bool]] = []
+        self._skip_depth = 0
+        self._article_depth = 0
+        self._block_depth = 0
+        self._buffer: List[str] = []
+
+    def handle_starttag(self, tag: str, attrs: list) -> None:
+        if tag in SKIPPED_TAGS:
+            self._skip_depth += 1
+        elif tag == "article":
+            self._article_depth += 1
+        elif tag in BLOCK_TAGS:
+            self._flush()
+            self._block_depth += 1
+        elif tag == "br" and self._block_depth:
+            self._buffer.append(" ")
+
+    def handle_endtag(self, tag: str) -> None:
+        if tag in SKIPPED_TAGS:
+            self._skip_depth = max(0, self._skip_depth - 1)
+        elif tag == "article":
+            self._flush()
+            self._article_depth = max(0, self._article_depth - 1)
+        elif tag in BLOCK_TAGS:
+            self._flush()
+            self._block_depth = max(0, self._block_depth - 1)
+
+    def handle_data(self, data: str) -> None:
+        if self._block_depth and not self._skip_depth:
+            self._buffer.append(data)
+
+    def _flush(self) -> None:
+        text = " ".join("".join(self._buffer).split())
+        if len(text.split()) >= MIN_PARAGRAPH_WORDS:
+            self.paragraphs.append((text, self._article_depth > 0))
+        self._buffer = []
+
+    def close(self) -> None:
+        super().close()
+        self._flush()
+
+
+def extract_main_text(html: str) -> str:
+    """Extract the main text of an HTML page.
+
+    Paragraph-like blocks of at least MIN_PARAGRAPH_WORDS words are kept,
+    skipping navigation, scripts and other page furniture. When the page
+    marks up its story with <article>, only paragraphs inside it are used.
+
+    Args:
+        html: Page HTML
+
+    Returns:
+        Paragraphs separated by blank lines (empty if none were found)
+    """
+    parser = _MainTextParser()
+    parser.feed(html)
+    parser.close()
+
+    in_article = [text for text, inside in parser.paragraphs if inside]
+    paragraphs = in_article or [text for text, _ in parser.paragraphs]
+
+    return "\n\n".join(paragraphs)[:MAX_CONTENT_CHARS]
+
+
+def _domain_limit(host: str) -> Tuple[threading.Semaphore, TokenBucket]:
+    """Return the concurrency and rate limits of a domain, created on first use."""
+    with _domain_lock:
+        if host not in _domain_limits:
+            _domain_limits[host] = (
+                threading.Semaphore(PER_DOMAIN_CONCURRENCY),
+                TokenBucket(PER_DOMAIN_REQUESTS_PER_SECOND),
+            )
+
+        return _domain_limits[host]
+
+
+def _cached_page(cache: DiskCache, key: str) -> str | None:
+    """Return a cached page, "" for a recent failure, or None on a miss.
+
+    Failed fetches are stored as ``{"failed_at": timestamp}`` and expire
+    after NEGATIVE_CACHE_TTL_DAYS, so a page that was unavailable is tried
+    again on a later run.
+    """
+    cached = cache.get(key)
+    if isinstance(cached, str) and cached:
+        return cached
+
+    if isinstance(cached, dict) and (
+        time.time() - cached.get("failed_at", 0) < NEGATIVE_CACHE_TTL_DAYS * 86400
+    ):
+        return ""
+
+    return None
+
+
+def _fetch_page(url: str, cache: DiskCache, timeout: float, cache_only: bool) -> str:
+    """Return the HTML of a page from the cache or, on a miss, from the web."""
+    key = canonicalize_url(url)
+    cached = _cached_page(cache, key)
+    if cached is not None or cache_only:
+        return cached or ""
+
+    host = urlsplit(url).netloc.lower()
+    semaphore, rate_limiter = _domain_limit(host)
+
+    try:
+        with semaphore:
+            resp = http_get(
+                url,
+                timeout=timeout,
+                max_retries=PAGE_MAX_RETRIES,
+                rate_limiter=rate_limiter,
+                headers={"User-Agent": USER_AGENT},
+                max_bytes=MAX_PAGE_BYTES,
+            )
+    except requests.HTTPError as e:
+        # Client errors (paywalls, removed pages) will not go away on the
+        # next run; timeouts and rate limiting might
+        status = e.response.status_code if e.response is not None else None
+        if (
+            status is not None
+            and 400 <= status < 500
+            and status not in TRANSIENT_CLIENT_ERRORS
+        ):
+            cache.set(key, {"failed_at": time.time()})
+        logger.debug(f"Could not fetch {url}: {e}")
+        return ""
+    except requests.RequestException as e:
+        logger.debug(f"Could not fetch {url}: {e}")
+        return ""
+
+    content_type = resp.headers.get("Content-Type", "text/html").lower()
+    if "html" not in content_type:
+        cache.set(key, {"failed_at": time.time()})
+        return ""
+
+    # Without a declared charset requests assumes Latin-1; most pages are UTF-8
+    encoding = (resp.encoding if "charset" in content_type else None) or "utf-8"
+    html = resp.content.decode(encoding, errors="replace")
+    cache.set(key, html)
+    return html
+
+
+def extract_full_text(
+    df: pd.DataFrame,
+    workers: int = DEFAULT_EXTRACTION_WORKERS,
+    timeout: float = DEFAULT_PAGE_TIMEOUT,
+    cache_only: bool = False,
+    cache_path: Path = PAGE_CACHE_PATH,
+) -> pd.DataFrame:
+    """Replace truncated article content with the main text of each page.
+
+    The extracted text is used when it is at least MIN_EXTRACTED_CHARS long
+    and longer than the content the API returned; otherwise the article is
+    left unchanged.
+
+    Args:
+        df: Articles with 'url' and 'content' columns
+        workers: Number of pages fetched concurrently
+        timeout: Per-request timeout in seconds
+        cache_only: Only use cached pages (e.g. when replaying past runs)
+        cache_path: SQLite file of the page cache
+
+    Returns:
+        Copy of df with the extended content
+    """
+    if df.empty:
+        return df
+
+    cache = DiskCache(cache_path, max_bytes=PAGE_CACHE_MAX_MB * 1024 * 1024)
+
+    def extract(url: str) -> str:
+        html = _fetch_page(url, cache, timeout, cache_only)
+        return extract_main_text(html) if html else ""
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        texts = list(executor.map(extract, df["url"]))
+
+    df = df.copy()
+    current = df["content"].fillna("").str.len()
+    extracted = pd.Series(texts, index=df.index)
+    use_extracted = (extracted.str.len() >= MIN_EXTRACTED_CHARS) & (
+        extracted.str.len() > current
+    )
+    df.loc[use_extracted, "content"] = extracted[use_extracted]
+
+    logger.info(
+        f"Extracted full text for {int(use_extracted.sum())} of {len(df)} articles "
+        f"(page cache: {cache.hits} hits, {cache.misses} misses)"
+    )
+    return df
@@ -0,0 +1,181 @@
+"""SQLite-backed on-disk cache for JSON-serializable values."""
+
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+# Constants
+DEFAULT_CACHE_DIR = Path(".cache")
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+EVICTION_TARGET_RATIO = 0.9
+
+
+def cache_key(payload: Any) -> str:
+    """Build a content-addressed key from a JSON-serializable payload.
+
+    Dictionary keys are sorted so that logically equal payloads map to
+    the same key regardless of insertion order.
+
+    Args:
+        payload: Value describing what is cached (e.g. request parameters)
+
+    Returns:
+        Hex SHA-256 digest of the canonical JSON encoding
+    """
+    canonical = json.dumps(payload, sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class DiskCache:
+    """Key-value cache storing zlib-compressed JSON blobs in SQLite.
+
+    Entries older than ``ttl_seconds`` are treated as misses. When the
+    stored size exceeds ``max_bytes``, least recently used entries are
+    evicted. The cache is safe to share between threads.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        ttl_seconds: float | None = None,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+    ) -> None:
+        """Open (or create) a cache database.
+
+        Args:
+            path: SQLite database file
+            ttl_seconds: Maximum entry age in seconds (None keeps entries forever)
+            max_bytes: Maximum total size of stored values
+        """
+        self.path = Path(path)
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS entries (
+                key TEXT PRIMARY KEY,
+                value BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed_at)"
+        )
+        self._conn.commit()
+
+    def get(self, key: str) -> Any | None:
+        """Return the cached value for a key, or None on a miss.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Decoded value, or None if missing or expired
+        """
+        now = time.time()
+
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created_at FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+
+            if row is None or (
+                self.ttl_seconds is not None and now - row[1] > self.ttl_seconds
+            ):
+                self.misses += 1
+                return None
+
+            self._conn.execute(
+                "UPDATE entries SET accessed_at = ? WHERE key = ?", (now, key)
+            )
+            self._conn.commit()
+            self.hits += 1
+
+        return json.loads(zlib.decompress(row[0]))
+
+    def set(self, key: str, value: Any) -> None:
+        """Store a value, evicting old entries if the cache grows too large.
+
+        Args:
+            key: Cache key
+            value: JSON-serializable value
+        """
+        blob = zlib.compress(json.dumps(value, ensure_ascii=False).encode("utf-8"))
+        now = time.time()
+
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?)",
+                (key, blob, len(blob), now, now),
+            )
+            self._conn.commit()
+
+        self._evict_if_needed()
+
+    def prune(self) -> int:
+        """Remove expired entries and enforce the size limit.
+
+        Returns:
+            Number of entries removed
+        """
+        removed = 0
+
+        if self.ttl_seconds is not None:
+            with self._lock:
+                cursor = self._conn.execute(
+                    "DELETE FROM entries WHERE created_at < ?",
+                    (time.time() - self.ttl_seconds,),
+                )
+                self._conn.commit()
+                removed += cursor.rowcount
+
+        return removed + self._evict_if_needed()
+
+    def _evict_if_needed(self) -> int:
+        """Evict least recently used entries while over the size limit."""
+        with self._lock:
+            total = self._conn.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM entries"
+            ).fetchone()[0]
+
+            if total <= self.max_bytes:
+                return 0
+
+            target = self.max_bytes * EVICTION_TARGET_RATIO
+            evicted = 0
+
+            for key, size in self._conn.execute(
+                "SELECT key, size FROM entries ORDER BY accessed_at"
+            ).fetchall():
+                if total <= target:
+                    break
+                self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                total -= size
+                evicted += 1
+
+            self._conn.commit()
+
+        logger.debug(f"Evicted {evicted} entries from cache {self.path}")
+        return evicted
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
@@ -0,0 +1,267 @@
+"""Persistent embedding cache backed by a memory-mapped float32 matrix.
+
+Vectors are appended to a raw float32 file that is read through a memory
+map, and a small SQLite index maps each key (a hash of model name and text)
+to its row. Eviction writes a new generation of the matrix with only the
+rows still wanted and switches to it in the same transaction that renumbers
+the rows, so an interrupted eviction leaves the previous generation intact.
+"""
+
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List
+
+import numpy as np
+
+from disk_cache import DEFAULT_CACHE_DIR, EVICTION_TARGET_RATIO, cache_key
+
+logger = logging.getLogger(__name__)
+
+# Constants
+EMBEDDING_STORE_DIR = DEFAULT_CACHE_DIR / "embeddings"
+VECTORS_FILE = "vectors-{generation}.f32"
+INDEX_FILE = "index.sqlite"
+DEFAULT_MAX_ROWS = 200_000
+DEFAULT_MAX_AGE_DAYS = 90.0
+
+
+def embedding_key(model_name: str, text: str) -> str:
+    """Build the store key of a text embedded by a model.
+
+    Args:
+        model_name: Name identifying the model (and its settings)
+        text: Embedded text
+
+    Returns:
+        Hex SHA-256 digest of the model name and text
+    """
+    return cache_key({"model": model_name, "text": text})
+
+
+class EmbeddingStore:
+    """Append-only float32 embedding matrix with a SQLite key index.
+
+    Lookups are batched and served from a memory map, so cached vectors are
+    read without loading the whole matrix. Entries not used for
+    ``max_age_days`` or beyond ``max_rows`` (least recently used first) are
+    evicted by compacting the matrix: the row limit is enforced on append,
+    the age limit by prune(), which the compact command runs. The store is
+    safe to share between threads.
+    """
+
+    def __init__(
+        self,
+        directory: Path = EMBEDDING_STORE_DIR,
+        max_rows: int = DEFAULT_MAX_ROWS,
+        max_age_days: float | None = DEFAULT_MAX_AGE_DAYS,
+    ) -> None:
+        """Open (or create) an embedding store.
+
+        Args:
+            directory: Directory holding the vector file and key index
+            max_rows: Maximum number of stored vectors
+            max_age_days: Evict vectors not used for this many days (None
+                keeps them regardless of age)
+        """
+        self.directory = Path(directory)
+        self.max_rows = max_rows
+        self.max_age_days = max_age_days
+        self.hits = 0
+        self.misses = 0
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            self.directory / INDEX_FILE, check_same_thread=False
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS keys (
+                key TEXT PRIMARY KEY,
+                row INTEGER NOT NULL,
+                accessed_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS keys_accessed ON keys (accessed_at);
+            CREATE TABLE IF NOT EXISTS meta (
+                name TEXT PRIMARY KEY,
+                value INTEGER NOT NULL
+            );
+            """
+        )
+        self._conn.commit()
+
+        meta = dict(self._conn.execute("SELECT name, value FROM meta"))
+        self.dim: int | None = meta.get("dim")
+        self._generation: int = meta.get("generation", 0)
+
+    @property
+    def _vectors_path(self) -> Path:
+        """Vector file of the current generation."""
+        return self.directory / VECTORS_FILE.format(generation=self._generation)
+
+    def _num_rows(self) -> int:
+        """Number of vectors in the matrix file (including evicted ones)."""
+        if self.dim is None or not self._vectors_path.exists():
+            return 0
+
+        return self._vectors_path.stat().st_size // (self.dim * 4)
+
+    def _matrix(self) -> np.memmap:
+        """Memory-map the vector file read-only."""
+        return np.memmap(
+            self._vectors_path,
+            dtype=np.float32,
+            mode="r",
+            shape=(self._num_rows(), self.dim),
+        )
+
+    def get_many(self, keys: List[str]) -> Dict[str, np.ndarray]:
+        """Look up the vectors of many keys at once.
+
+        Args:
+            keys: Keys to look up
+
+        Returns:
+            Mapping of found keys to their vectors; missing keys are absent
+        """
+        if not keys or self.dim is None:
+            self.misses += len(keys)
+            return {}
+
+        unique_keys = list(dict.fromkeys(keys))
+        rows: Dict[str, int] = {}
+
+        with self._lock:
+            for start in range(0, len(unique_keys), 500):
+                batch = unique_keys[start : start + 500]
+                placeholders = ", ".join("?" * len(batch))
+                rows.update(
+                    self._conn.execute(
+                        f"SELECT key, row FROM keys WHERE key IN ({placeholders})",
+                        batch,
+                    )
+                )
+
+            if rows:
+                self._conn.executemany(
+                    "UPDATE keys SET accessed_at = ? WHERE key = ?",
+                    ((time.time(), key) for key in rows),
+                )
+                self._conn.commit()
+
+            found = list(rows)
+            vectors = (
+                np.asarray(self._matrix()[[rows[key] for key in found]])
+                if found
+                else np.empty((0, self.dim), dtype=np.float32)
+            )
+
+        self.hits += len(found)
+        self.misses += len(unique_keys) - len(found)
+
+        return dict(zip(found, vectors))
+
+    def add_many(self, keys: List[str], vectors: np.ndarray) -> None:
+        """Append vectors for keys, evicting old entries if over the limits.
+
+        Args:
+            keys: Keys of the vectors
+            vectors: Array of shape (len(keys), dim)
+        """
+        if not keys:
+            return
+
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        now = time.time()
+
+        with self._lock:
+            if self.dim is None:
+                self.dim = vectors.shape[1]
+                self._conn.execute("INSERT INTO meta VALUES ('dim', ?)", (self.dim,))
+
+            if vectors.shape[1] != self.dim:
+                raise ValueError(
+                    f"Expected {self.dim}-dimensional vectors, got {vectors.shape[1]}"
+                )
+
+            # Drop any partially written row left by an interrupted append
+            first_row = self._num_rows()
+            with open(self._vectors_path, "ab") as f:
+                f.truncate(first_row * self.dim * 4)
+                f.write(vectors.tobytes())
+
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO keys VALUES (?, ?, ?)",
+                ((key, first_row + i, now) for i, key in enumerate(keys)),
+            )
+            self._conn.commit()
+
+        self._evict_if_needed()
+
+    def prune(self) -> int:
+        """Evict expired vectors and enforce the row limit.
+
+        Returns:
+            Number of vectors evicted
+        """
+        return self._evict_if_needed(force=True)
+
+    def _evict_if_needed(self, force: bool = False) -> int:
+        """Compact the matrix to the wanted rows when over the row limit.
+
+        Dropping rows from the append-only file requires rewriting it, so
+        this only runs when the file holds more than max_rows vectors (or
+        when forced) and then trims to EVICTION_TARGET_RATIO of the limit.
+        """
+        with self._lock:
+            if not force and self._num_rows() <= self.max_rows:
+                return 0
+
+            min_accessed = (
+                time.time() - self.max_age_days * 86400
+                if self.max_age_days is not None
+                else 0.0
+            )
+            keep = self._conn.execute(
+                "SELECT key, row, accessed_at FROM keys WHERE accessed_at >= ? "
+                "ORDER BY accessed_at DESC LIMIT ?",
+                (min_accessed, int(self.max_rows * EVICTION_TARGET_RATIO)),
+            ).fetchall()
+
+            total = self._conn.execute("SELECT COUNT(*) FROM keys").fetchone()[0]
+            if self._num_rows() == len(keep):
+                return 0
+
+            old_path = self._vectors_path
+            new_path = self.directory / VECTORS_FILE.format(
+                generation=self._generation + 1
+            )
+            rows = [row for _, row, _ in keep]
+            kept = self._matrix()[rows] if rows else np.empty((0, self.dim))
+            np.asarray(kept, dtype=np.float32).tofile(new_path)
+
+            self._conn.execute("DELETE FROM keys")
+            self._conn.executemany(
+                "INSERT INTO keys VALUES (?, ?, ?)",
+                ((key, i, accessed_at) for i, (key, _, accessed_at) in enumerate(keep)),
+            )
+            self._conn.execute(
+                "INSERT OR REPLACE INTO meta VALUES ('generation', ?)",
+                (self._generation + 1,),
+            )
+            self._conn.commit()
+
+            self._generation += 1
+            old_path.unlink(missing_ok=True)
+
+        evicted = total - len(keep)
+        logger.debug(f"Evicted {evicted} vectors from embedding store {self.directory}")
+        return evicted
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM keys").fetchone()[0]
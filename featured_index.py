@@ -0,0 +1,165 @@
+"""Persistent index of articles already featured in a sent digest.
+
+Articles are identified by their canonical URL and by a hash of their
+normalized text, so a story that was featured once is recognized again
+even when it is re-fetched under a slightly different URL.
+"""
+
+import hashlib
+import logging
+import sqlite3
+from datetime import date
+from pathlib import Path
+from typing import Tuple
+
+import pandas as pd
+
+from archive_store import iter_article_batches
+from disk_cache import DEFAULT_CACHE_DIR
+from helper_functions import canonicalize_url, tokenize
+
+logger = logging.getLogger(__name__)
+
+# Constants
+FEATURED_INDEX_PATH = DEFAULT_CACHE_DIR / "featured_index.sqlite"
+INDEX_COLUMNS = ["title", "url", "description", "fetched_from"]
+
+
+def _text_hash(text: str) -> str:
+    """Hash the normalized tokens of a text (empty for texts without tokens)."""
+    tokens = tokenize(text)
+    if not tokens:
+        return ""
+
+    return hashlib.sha1(" ".join(tokens).encode("utf-8")).hexdigest()
+
+
+def content_hashes(df: pd.DataFrame) -> pd.Series:
+    """Hash the normalized title and description of each article.
+
+    GDELT descriptions only hold the domain, so GDELT rows are hashed on
+    the title alone.
+
+    Args:
+        df: DataFrame with 'title', 'description' and 'fetched_from' columns
+
+    Returns:
+        Hex SHA-1 digest per row (empty for rows without any text)
+    """
+    description = df["description"].fillna("").where(df["fetched_from"] != "gdelt", "")
+
+    return (df["title"].fillna("") + " " + description).map(_text_hash)
+
+
+class FeaturedIndex:
+    """SQLite index of the canonical URLs and content hashes of featured articles.
+
+    The index is bootstrapped from the top-article archives the first time
+    it is opened and afterwards only grows through add(), which the
+    pipeline calls once a digest has been sent.
+    """
+
+    def __init__(self, path: Path = FEATURED_INDEX_PATH) -> None:
+        """Open (or create and bootstrap) the featured index.
+
+        Args:
+            path: SQLite database file
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        self._conn = sqlite3.connect(self.path)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS featured (
+                url TEXT PRIMARY KEY,
+                content_hash TEXT NOT NULL,
+                featured_on TEXT NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS featured_hash ON featured (content_hash)"
+        )
+        self._conn.commit()
+
+        if len(self) == 0:
+            self._bootstrap_from_archives()
+
+    def _bootstrap_from_archives(self) -> None:
+        """Index every article in the top-article archives."""
+        added = 0
+        for batch in iter_article_batches("top_articles", columns=INDEX_COLUMNS):
+            for featured_on, digest in batch.groupby("archive_date"):
+                added += self.add(digest, featured_on)
+
+        logger.info(f"Built featured index from archives ({added} articles)")
+
+    def add(self, df: pd.DataFrame, featured_on: date) -> int:
+        """Record articles as featured.
+
+        Args:
+            df: Featured articles with 'title', 'url', 'description' and
+                'fetched_from' columns
+            featured_on: Date of the digest that featured them
+
+        Returns:
+            Number of articles added to the index
+        """
+        rows = zip(
+            df["url"].map(canonicalize_url),
+            content_hashes(df),
+            [featured_on.isoformat()] * len(df),
+        )
+
+        before = len(self)
+        self._conn.executemany("INSERT OR IGNORE INTO featured VALUES (?, ?, ?)", rows)
+        self._conn.commit()
+
+        return len(self) - before
+
+    def drop_featured(
+        self, df: pd.DataFrame, before: date | None = None
+    ) -> Tuple[pd.DataFrame, int]:
+        """Remove articles that were already featured.
+
+        Args:
+            df: Candidate articles with 'title', 'url', 'description' and
+                'fetched_from' columns
+            before: Only count digests dated strictly before this day (used
+                when replaying past runs); None counts every digest
+
+        Returns:
+            Tuple of the remaining articles and the number dropped
+        """
+        if df.empty:
+            return df, 0
+
+        cutoff = (before or date.max).isoformat()
+        urls = {
+            url
+            for (url,) in self._conn.execute(
+                "SELECT url FROM featured WHERE featured_on < ?", (cutoff,)
+            )
+        }
+        hashes = {
+            content_hash
+            for (content_hash,) in self._conn.execute(
+                "SELECT content_hash FROM featured "
+                "WHERE featured_on < ? AND content_hash != ''",
+                (cutoff,),
+            )
+        }
+
+        seen_url = df["url"].map(canonicalize_url).isin(urls)
+        seen = seen_url | content_hashes(df).isin(hashes)
+        dropped = int(seen.sum())
+        logger.info(f"Dropped {dropped} articles already featured in a past digest")
+
+        return df[~seen].reset_index(drop=True), dropped
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def __len__(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM featured").fetchone()[0]
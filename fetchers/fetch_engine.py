@@ -0,0 +1,85 @@
+"""Concurrent fetch engine for chunked article queries."""
+
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List
+
+logger = logging.getLogger(__name__)
+
+
+def run_chunks_concurrently(
+    fetch_chunk: Callable[..., List[Dict[str, Any]]],
+    chunks: List[List[str]],
+    max_concurrency: int = 4,
+    label: str = "fetch",
+    chunk_kwargs: List[Dict[str, Any]] | None = None,
+    **fetch_kwargs: Any,
+) -> List[List[Dict[str, Any]]]:
+    """Run a chunk fetcher over many query chunks with bounded parallelism.
+
+    Chunks that still fail after the transport's retries are logged and
+    yield an empty result so that one bad request does not abort the
+    whole source.
+
+    Args:
+        fetch_chunk: Function fetching a single chunk of query terms
+        chunks: Query term chunks, one request per chunk
+        max_concurrency: Maximum number of chunks in flight at once
+        label: Source name used in log messages
+        chunk_kwargs: Optional per-chunk keyword overrides, in chunk order
+        **fetch_kwargs: Extra keyword arguments passed to fetch_chunk
+
+    Returns:
+        Per-chunk article lists, in the same order as chunks
+    """
+
+    def run_one(chunk: List[str], overrides: Dict[str, Any]) -> List[Dict[str, Any]]:
+        try:
+            items = fetch_chunk(query_terms=chunk, **{**fetch_kwargs, **overrides})
+            logger.debug(f"Fetched {len(items)} articles from {label} chunk")
+            return items
+
+        except Exception as e:
+            logger.error(f"{label} chunk error: {e}")
+            return []
+
+    if not chunks:
+        return []
+
+    if chunk_kwargs is None:
+        chunk_kwargs = [{} for _ in chunks]
+
+    workers = max(1, min(max_concurrency, len(chunks)))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix=label) as pool:
+        return list(pool.map(run_one, chunks, chunk_kwargs))
+
+
+def fetch_all_sources(
+    source_fetchers: Dict[str, Callable[..., List[Dict[str, Any]]]],
+    source_kwargs: Dict[str, Dict[str, Any]] | None = None,
+    **fetch_kwargs: Any,
+) -> Dict[str, List[Dict[str, Any]]]:
+    """Run several source fetchers at the same time.
+
+    Each source keeps its own concurrency limit and rate limiter, so running
+    them side by side only overlaps requests to different hosts.
+
+    Args:
+        source_fetchers: Mapping of source name to its fetch_all function
+        source_kwargs: Optional per-source keyword overrides
+        **fetch_kwargs: Keyword arguments passed to every fetch_all function
+
+    Returns:
+        Mapping of source name to the list of fetched articles
+    """
+    source_kwargs = source_kwargs or {}
+
+    with ThreadPoolExecutor(max_workers=max(1, len(source_fetchers))) as pool:
+        futures = {
+            name: pool.submit(
+                fetch_all, **{**fetch_kwargs, **source_kwargs.get(name, {})}
+            )
+            for name, fetch_all in source_fetchers.items()
+        }
+
+        return {name: future.result() for name, future in futures.items()}
@@ -2,13 +2,16 @@
 
 import logging
 import os
-from datetime import date, datetime, timedelta, timezone
-from typing import Dict, List, Any
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Dict, List, Any, Tuple
 
 import requests
 from dotenv import load_dotenv
 
-from helper_functions import chunk_list
+from fetchers.fetch_engine import run_chunks_concurrently
+from fetchers.http_transport import get_json
+from fetchers.watermarks import ChunkResult, advance_watermarks, resume_points
+from helper_functions import TokenBucket, chunk_list
 
 logger = logging.getLogger(__name__)
 
@@ -17,6 +20,126 @@ GDELT_API_ENDPOINT = os.getenv("GDELT_API_ENDPOINT")
 
 # Constants
 DEFAULT_MAX_RECORDS = 50
+DEFAULT_MIN_WINDOW = timedelta(hours=1)
+DEFAULT_MAX_CONCURRENCY = 2
+# The DOC API allows one request every 5 seconds and answers 429 above that
+RATE_LIMIT_PER_SECOND = 0.2
+RATE_LIMIT_BURST = 1
+MIN_RETRY_DELAY_SECONDS = 5.0
+
+rate_limiter = TokenBucket(rate=RATE_LIMIT_PER_SECOND, capacity=RATE_LIMIT_BURST)
+
+
+def build_gdelt_query(query_terms: List[str]) -> str:
+    """Build a GDELT OR-query from search terms.
+
+    GDELT only accepts parentheses around OR'd statements, so a single
+    term is sent bare.
+
+    Args:
+        query_terms: List of search terms
+
+    Returns:
+        GDELT query string
+    """
+    # Quote terms with spaces
+    quoted_terms = [f'"{term}"' if " " in term else term for term in query_terms]
+
+    if len(quoted_terms) == 1:
+        return quoted_terms[0]
+
+    return "(" + " OR ".join(quoted_terms) + ")"
+
+
+def _fetch_gdelt_window(
+    query: str, start: datetime, end: datetime, maxrecords: int
+) -> List[Dict[str, Any]]:
+    """Request one ArtList page of raw GDELT articles for a time window.
+
+    Args:
+        query: Fully built GDELT query string
+        start: Window start
+        end: Window end (inclusive)
+        maxrecords: Maximum number of articles to request
+
+    Returns:
+        Raw article dictionaries as returned by GDELT
+    """
+    # GDELT uses specific datetime format: YYYYMMDDhhmmss
+    params = {
+        "query": query,
+        "mode": "ArtList",
+        "maxrecords": maxrecords,
+        "format": "json",
+        "startdatetime": start.strftime("%Y%m%d%H%M%S"),
+        "enddatetime": end.strftime("%Y%m%d%H%M%S"),
+    }
+
+    try:
+        data = get_json(
+            GDELT_API_ENDPOINT,
+            params=params,
+            rate_limiter=rate_limiter,
+            min_retry_delay=MIN_RETRY_DELAY_SECONDS,
+        )
+    except requests.RequestException as e:
+        logger.error(f"GDELT request failed: {e}")
+        raise
+
+    return data.get("articles", [])
+
+
+def _fetch_gdelt_adaptive(
+    query: str,
+    start: datetime,
+    end: datetime,
+    maxrecords: int,
+    min_window: timedelta,
+) -> Tuple[List[Dict[str, Any]], bool]:
+    """Fetch a window, bisecting it while responses come back saturated.
+
+    A response holding maxrecords articles means GDELT had more matches
+    than it returned, so the window is split in half and both halves are
+    queued. Windows shorter than min_window are not split. The windows are
+    fetched one after another, since the rate limit allows no parallelism.
+
+    Args:
+        query: Fully built GDELT query string
+        start: Window start
+        end: Window end (inclusive)
+        maxrecords: Maximum number of articles per request
+        min_window: Smallest window that may still be bisected
+
+    Returns:
+        Tuple of the raw article dictionaries and whether they cover the
+        whole window (False if a window was still saturated at min_window)
+    """
+    articles = []
+    complete = True
+    # Stack of windows still to fetch, earliest on top
+    pending = [(start, end)]
+
+    while pending:
+        window_start, window_end = pending.pop()
+        window = _fetch_gdelt_window(query, window_start, window_end, maxrecords)
+
+        if len(window) < maxrecords:
+            articles.extend(window)
+            continue
+
+        if window_end - window_start < 2 * min_window:
+            logger.debug(
+                f"GDELT window {window_start} - {window_end} saturated at minimum size"
+            )
+            articles.extend(window)
+            complete = False
+            continue
+
+        mid = window_start + (window_end - window_start) / 2
+        pending.append((mid + timedelta(seconds=1), window_end))
+        pending.append((window_start, mid))
+
+    return articles, complete
 
 
 def fetch_chunk_from_gdelt(
@@ -24,17 +147,23 @@ def fetch_chunk_from_gdelt(
     maxrecords: int = DEFAULT_MAX_RECORDS,
     from_date: date | None = None,
     to_date: date | None = None,
-) -> List[Dict[str, Any]]:
+    min_window: timedelta = DEFAULT_MIN_WINDOW,
+) -> ChunkResult:
     """Fetch a chunk of articles from GDELT.
 
+    The date range is split adaptively whenever GDELT returns a full page,
+    so popular terms are covered beyond the per-request record cap.
+
     Args:
         query_terms: List of search terms
-        maxrecords: Maximum number of articles to fetch
+        maxrecords: Maximum number of articles to fetch per request
         from_date: Start date for article search
         to_date: End date for article search
+        min_window: Smallest time window that may still be split
 
     Returns:
-        List of normalized article dictionaries
+        Normalized article dictionaries, flagged incomplete when a window
+        was still saturated at min_window
 
     Raises:
         ValueError: If query_terms is None
@@ -46,9 +175,7 @@ def fetch_chunk_from_gdelt(
     if GDELT_API_ENDPOINT is None:
         raise RuntimeError("GDELT_API_ENDPOINT is not set in .env file")
 
-    # Quote terms with spaces
-    quoted_terms = [f'"{term}"' if " " in term else term for term in query_terms]
-    or_joined = "(" + " OR ".join(quoted_terms) + ")"
+    or_joined = build_gdelt_query(query_terms)
 
     if to_date is None:
         to_date = datetime.now(timezone.utc).date()
@@ -56,30 +183,26 @@ def fetch_chunk_from_gdelt(
     if from_date is None:
         from_date = to_date - timedelta(days=7)
 
-    # GDELT uses specific datetime format: YYYYMMDDhhmmss
-    start_str = from_date.strftime("%Y%m%d") + "000000"
-    end_str = to_date.strftime("%Y%m%d") + "235959"
+    # Incremental runs pass the exact resume point as a datetime
+    if isinstance(from_date, datetime):
+        start = from_date
+    else:
+        start = datetime.combine(from_date, time.min)
+    end = datetime.combine(to_date, time(23, 59, 59))
 
-    params = {
-        "query": or_joined,
-        "mode": "ArtList",
-        "maxrecords": maxrecords,
-        "format": "json",
-        "startdatetime": start_str,
-        "enddatetime": end_str,
-    }
+    articles, complete = _fetch_gdelt_adaptive(
+        or_joined, start, end, maxrecords, min_window
+    )
 
-    try:
-        resp = requests.get(GDELT_API_ENDPOINT, params=params, timeout=30)
-        resp.raise_for_status()
-        data = resp.json()
-    except requests.RequestException as e:
-        logger.error(f"GDELT request failed: {e}")
-        raise
+    normalized = ChunkResult(complete=complete)
+    seen_urls = set()
 
-    normalized = []
+    for article in articles:
+        url = article.get("url", "")
+        if url in seen_urls:
+            continue
+        seen_urls.add(url)
 
-    for article in data.get("articles", []):
         # Parse GDELT's datetime format
         seen_date = article.get("seendate", "")
         seen_time = article.get("seentime", "")
@@ -91,12 +214,18 @@ def fetch_chunk_from_gdelt(
                 f"{seen_date[:4]}-{seen_date[4:6]}-{seen_date[6:]}T"
                 f"{seen_time[:2]}:{seen_time[2:4]}:{seen_time[4:]}Z"
             )
+        elif len(seen_date) == 16:
+            # Current API returns a single YYYYMMDDThhmmssZ value
+            published_at = (
+                f"{seen_date[:4]}-{seen_date[4:6]}-{seen_date[6:8]}T"
+                f"{seen_date[9:11]}:{seen_date[11:13]}:{seen_date[13:15]}Z"
+            )
 
         normalized.append(
             {
                 "source": article.get("domain", "GDELT"),
                 "title": article.get("title", ""),
-                "url": article.get("url", ""),
+                "url": url,
                 "published_at": published_at,
                 "description": article.get("domain", ""),
                 "content": article.get("seendate", ""),
@@ -112,17 +241,27 @@ def fetch_all_from_gdelt(
     chunk_size: int = 6,
     from_date: date | None = None,
     to_date: date | None = None,
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+    watermarks: Dict[str, str] | None = None,
+    chunks: List[List[str]] | None = None,
 ) -> List[Dict[str, Any]]:
     """Fetch all articles from GDELT using chunked queries.
 
     Splits query terms into chunks to avoid API limitations and fetches
-    articles for each chunk.
+    the chunks concurrently, bounded by max_concurrency. Individual requests
+    go through the shared transport and the module rate limiter.
 
     Args:
         query_terms: List of search terms
         chunk_size: Number of terms to include per API request
         from_date: Start date for article search
         to_date: End date for article search
+        max_concurrency: Maximum number of chunk requests in flight
+        watermarks: Per-chunk high-watermarks; when given, each chunk only
+            fetches articles newer than its watermark and the watermarks
+            are advanced in place
+        chunks: Precomputed query chunks (e.g. from the query planner);
+            overrides chunk_size when given
 
     Returns:
         List of all fetched articles
@@ -131,19 +270,29 @@ def fetch_all_from_gdelt(
 
     logger.info(f"Fetching GDELT (from {from_date} to {to_date})...")
 
-    for chunk in chunk_list(query_terms, chunk_size):
-        try:
-            items = fetch_chunk_from_gdelt(
-                query_terms=chunk,
-                maxrecords=DEFAULT_MAX_RECORDS,
-                from_date=from_date,
-                to_date=to_date,
-            )
-            all_gdelt_items.extend(items)
-            logger.debug(f"Fetched {len(items)} articles from chunk")
-
-        except Exception as e:
-            logger.error(f"GDELT chunk error: {e}")
+    if chunks is None:
+        chunks = list(chunk_list(query_terms, chunk_size))
+    chunk_kwargs = None
+
+    if watermarks is not None and from_date is not None:
+        chunk_kwargs = resume_points(watermarks, "gdelt", chunks, from_date)
+
+    chunk_results = run_chunks_concurrently(
+        fetch_chunk_from_gdelt,
+        chunks,
+        max_concurrency=max_concurrency,
+        chunk_kwargs=chunk_kwargs,
+        label="GDELT",
+        maxrecords=DEFAULT_MAX_RECORDS,
+        from_date=from_date,
+        to_date=to_date,
+    )
+
+    for items in chunk_results:
+        all_gdelt_items.extend(items)
+
+    if watermarks is not None:
+        advance_watermarks(watermarks, "gdelt", chunks, chunk_results)
 
     logger.info(f"Total GDELT articles fetched: {len(all_gdelt_items)}")
 
@@ -0,0 +1,319 @@
+"""Shared HTTP transport for the article fetchers.
+
+Keeps one pooled keep-alive session per host, retries transient failures
+with jittered exponential backoff (honouring ``Retry-After`` on 429/503),
+records per-host latency and byte counters, and caches JSON responses on
+disk so reruns do not spend API quota twice.
+"""
+
+import logging
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from disk_cache import DEFAULT_CACHE_DIR, DiskCache, cache_key
+from helper_functions import TokenBucket, backoff_delay
+
+logger = logging.getLogger(__name__)
+
+# Constants
+DEFAULT_TIMEOUT = 30
+DEFAULT_MAX_RETRIES = 4
+POOL_MAXSIZE = 10
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+BACKOFF_BASE_SECONDS = 1.0
+BACKOFF_CAP_SECONDS = 30.0
+MAX_RETRY_AFTER_SECONDS = 120.0
+RESPONSE_CACHE_PATH = DEFAULT_CACHE_DIR / "http_responses.sqlite"
+DEFAULT_RESPONSE_CACHE_TTL_HOURS = 24.0
+DEFAULT_RESPONSE_CACHE_MAX_MB = 200
+STREAM_CHUNK_BYTES = 64 * 1024
+
+_sessions: Dict[str, requests.Session] = {}
+_stats: Dict[str, Dict[str, float]] = {}
+_lock = threading.Lock()
+_response_cache: DiskCache | None = None
+_response_cache_enabled = True
+
+
+def _get_session(host: str) -> requests.Session:
+    """Return the pooled session for a host, creating it on first use."""
+    with _lock:
+        session = _sessions.get(host)
+
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=POOL_MAXSIZE)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            _sessions[host] = session
+
+        return session
+
+
+def _record(host: str, **counters: float) -> None:
+    """Add counter values to a host's statistics."""
+    with _lock:
+        host_stats = _stats.setdefault(
+            host,
+            {
+                "requests": 0,
+                "retries": 0,
+                "failures": 0,
+                "bytes": 0,
+                "latency_seconds": 0.0,
+            },
+        )
+        for name, value in counters.items():
+            host_stats[name] += value
+
+
+def _retry_after_seconds(resp: requests.Response) -> float | None:
+    """Parse a Retry-After header given either in seconds or as an HTTP date."""
+    header = resp.headers.get("Retry-After")
+    if not header:
+        return None
+
+    try:
+        seconds = float(header)
+    except ValueError:
+        try:
+            retry_at = parsedate_to_datetime(header)
+        except (TypeError, ValueError):
+            return None
+        seconds = (retry_at - datetime.now(timezone.utc)).total_seconds()
+
+    return min(max(seconds, 0.0), MAX_RETRY_AFTER_SECONDS)
+
+
+def _read_capped(resp: requests.Response, max_bytes: int) -> None:
+    """Read at most max_bytes of a streamed body and release the connection."""
+    body = bytearray()
+    try:
+        for chunk in resp.iter_content(STREAM_CHUNK_BYTES):
+            body += chunk
+            if len(body) >= max_bytes:
+                break
+    finally:
+        resp.close()
+
+    resp._content = bytes(body[:max_bytes])
+
+
+def http_get(
+    url: str,
+    params: Dict[str, Any] | None = None,
+    timeout: float = DEFAULT_TIMEOUT,
+    max_retries: int = DEFAULT_MAX_RETRIES,
+    rate_limiter: TokenBucket | None = None,
+    headers: Dict[str, str] | None = None,
+    min_retry_delay: float = 0.0,
+    max_bytes: int | None = None,
+) -> requests.Response:
+    """Perform a GET request over the pooled session for the URL's host.
+
+    Connection errors, timeouts, truncated chunked bodies and retryable
+    status codes are retried with jittered exponential backoff. A
+    ``Retry-After`` header, when present, sets the minimum wait before the
+    next attempt.
+
+    Args:
+        url: Request URL
+        params: Query string parameters
+        timeout: Per-attempt timeout in seconds
+        max_retries: Number of retries after the first attempt
+        rate_limiter: Optional token bucket acquired before every attempt
+        headers: Extra request headers
+        min_retry_delay: Shortest wait before a retry, for APIs whose rate
+            limit is longer than the backoff
+        max_bytes: Stream the body and stop reading after this many bytes
+            (the response content is then truncated)
+
+    Returns:
+        Successful response
+
+    Raises:
+        requests.RequestException: If the response has a non-retryable error
+            status or the request still fails after all retries
+    """
+    host = urlsplit(url).netloc
+    session = _get_session(host)
+
+    attempt = 0
+
+    while True:
+        if rate_limiter is not None:
+            rate_limiter.acquire()
+
+        start = time.monotonic()
+        retry_after = None
+
+        try:
+            resp = session.get(
+                url,
+                params=params,
+                timeout=timeout,
+                headers=headers,
+                stream=max_bytes is not None,
+            )
+            if max_bytes is not None:
+                _read_capped(resp, max_bytes)
+
+            _record(
+                host,
+                requests=1,
+                bytes=len(resp.content),
+                latency_seconds=time.monotonic() - start,
+            )
+
+            if resp.status_code not in RETRY_STATUS_CODES:
+                if resp.status_code >= 400:
+                    _record(host, failures=1)
+                resp.raise_for_status()
+                return resp
+
+            retry_after = _retry_after_seconds(resp)
+            error: requests.RequestException = requests.HTTPError(
+                f"{resp.status_code} Error for host {host}", response=resp
+            )
+
+        except (
+            requests.ConnectionError,
+            requests.Timeout,
+            requests.exceptions.ChunkedEncodingError,
+        ) as e:
+            _record(host, requests=1, latency_seconds=time.monotonic() - start)
+            error = e
+
+        if attempt >= max_retries:
+            _record(host, failures=1)
+            raise error
+
+        delay = backoff_delay(attempt, BACKOFF_BASE_SECONDS, BACKOFF_CAP_SECONDS)
+        delay = max(delay, min_retry_delay)
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+
+        _record(host, retries=1)
+        logger.warning(
+            f"Request to {host} failed ({error}); "
+            f"retry {attempt + 1}/{max_retries} in {delay:.1f}s"
+        )
+        time.sleep(delay)
+        attempt += 1
+
+
+def configure_response_cache(
+    enabled: bool = True,
+    ttl_hours: float = DEFAULT_RESPONSE_CACHE_TTL_HOURS,
+    max_mb: int = DEFAULT_RESPONSE_CACHE_MAX_MB,
+) -> None:
+    """Configure the on-disk response cache used by get_json.
+
+    Args:
+        enabled: Whether responses are read from and written to the cache
+        ttl_hours: Maximum age of a cached response
+        max_mb: Size limit of the cache file contents in megabytes
+    """
+    global _response_cache, _response_cache_enabled
+
+    with _lock:
+        _response_cache_enabled = enabled
+        _response_cache = (
+            DiskCache(
+                RESPONSE_CACHE_PATH,
+                ttl_seconds=ttl_hours * 3600,
+                max_bytes=max_mb * 1024 * 1024,
+            )
+            if enabled
+            else None
+        )
+
+
+def _get_response_cache() -> DiskCache | None:
+    """Return the response cache, opening it with defaults on first use."""
+    if _response_cache is None and _response_cache_enabled:
+        configure_response_cache()
+
+    return _response_cache
+
+
+def prune_response_cache() -> int:
+    """Remove expired responses and enforce the response cache size limit.
+
+    Returns:
+        Number of cached responses removed
+    """
+    cache = _get_response_cache()
+
+    return cache.prune() if cache is not None else 0
+
+
+def get_json(url: str, params: Dict[str, Any] | None = None, **kwargs: Any) -> Any:
+    """GET a JSON document, serving it from the response cache when possible.
+
+    The cache key is the URL plus the normalized query parameters, so it
+    covers the endpoint, query terms, date window and page. Request headers
+    (including API keys) are not part of the key.
+
+    Args:
+        url: Request URL
+        params: Query string parameters
+        **kwargs: Extra keyword arguments passed to http_get
+
+    Returns:
+        Decoded JSON response
+
+    Raises:
+        requests.RequestException: If the request fails or is not valid JSON
+    """
+    cache = _get_response_cache()
+    key = cache_key(
+        {"url": url, "params": {k: str(v) for k, v in (params or {}).items()}}
+    )
+
+    if cache is not None:
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+
+    data = http_get(url, params=params, **kwargs).json()
+
+    if cache is not None:
+        cache.set(key, data)
+
+    return data
+
+
+def get_transport_stats() -> Dict[str, Dict[str, float]]:
+    """Return a snapshot of the per-host request counters.
+
+    Returns:
+        Mapping of host to its counters
+    """
+    with _lock:
+        return {host: dict(counters) for host, counters in _stats.items()}
+
+
+def log_transport_stats() -> None:
+    """Log a one-line summary of the request counters for every host."""
+    for host, counters in get_transport_stats().items():
+        requests_made = int(counters["requests"])
+        avg_latency = counters["latency_seconds"] / max(requests_made, 1)
+        logger.info(
+            f"{host}: {requests_made} requests, {int(counters['retries'])} retries, "
+            f"{int(counters['failures'])} failures, "
+            f"{counters['bytes'] / 1024:.1f} KiB, avg latency {avg_latency:.2f}s"
+        )
+
+    if _response_cache is not None:
+        logger.info(
+            f"Response cache: {_response_cache.hits} hits, "
+            f"{_response_cache.misses} misses"
+        )
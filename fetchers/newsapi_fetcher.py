@@ -3,13 +3,15 @@
 import logging
 import os
 from datetime import date, datetime, timedelta, timezone
-from typing import Dict, List, Any
-from urllib.parse import quote_plus
+from typing import Dict, Generator, List, Any
 
 import requests
 from dotenv import load_dotenv
 
-from helper_functions import chunk_list
+from fetchers.fetch_engine import run_chunks_concurrently
+from fetchers.http_transport import get_json
+from fetchers.watermarks import ChunkResult, advance_watermarks, resume_points
+from helper_functions import TokenBucket, chunk_list
 
 logger = logging.getLogger(__name__)
 
@@ -18,30 +20,77 @@ NEWSAPI_KEY = os.getenv("NEWSAPI_KEY")
 
 # Constants
 NEWSAPI_BASE_URL = "https://newsapi.org/v2/everything"
-DEFAULT_PAGE_SIZE = 50
+DEFAULT_PAGE_SIZE = 100
+DEFAULT_MAX_PAGES = 5
 DEFAULT_LANGUAGE = "en"
+DEFAULT_MAX_CONCURRENCY = 4
+RATE_LIMIT_PER_SECOND = 5.0
+RATE_LIMIT_BURST = 5
+# Plans capped at a number of results answer later pages with this status
+RESULT_CAP_STATUS = 426
+RESULT_CAP_ERROR_CODE = "maximumResultsReached"
 
+rate_limiter = TokenBucket(rate=RATE_LIMIT_PER_SECOND, capacity=RATE_LIMIT_BURST)
 
-def fetch_chunk_from_newsapi(
+# Result cap of the API key's plan, learned from the first capped response
+_plan_result_cap: int | None = None
+
+
+def build_newsapi_query(query_terms: List[str]) -> str:
+    """Build a NewsAPI OR-query of exact-phrase search terms.
+
+    Args:
+        query_terms: List of search terms
+
+    Returns:
+        NewsAPI 'q' parameter value
+    """
+    return " OR ".join([f'"{term}"' for term in query_terms])
+
+
+def _is_result_cap(error: requests.RequestException) -> bool:
+    """Return whether a failed page means the plan's result cap was reached."""
+    response = getattr(error, "response", None)
+    if response is None:
+        return False
+
+    return (
+        response.status_code == RESULT_CAP_STATUS
+        or RESULT_CAP_ERROR_CODE in response.text
+    )
+
+
+def iter_articles_from_newsapi(
     query_terms: List[str] | None = None,
     page_size: int = DEFAULT_PAGE_SIZE,
     from_date: date | None = None,
     to_date: date | None = None,
-) -> List[Dict[str, Any]]:
-    """Fetch a chunk of articles from NewsAPI.
+    max_pages: int = DEFAULT_MAX_PAGES,
+) -> Generator[Dict[str, Any], None, bool]:
+    """Stream normalized NewsAPI articles for a query, page by page.
+
+    Follows ``page=`` until ``totalResults`` is exhausted or max_pages is
+    reached, yielding each article as soon as its page arrives. The
+    generator returns whether every matching article was yielded; it
+    returns False when max_pages was reached or a later page failed.
+    Reaching the result cap of the API plan (HTTP 426) ends the results
+    instead, since no later run could fetch more; once seen, the cap stops
+    other queries before they request a page past it.
 
     Args:
         query_terms: List of search terms
-        page_size: Number of articles to fetch
+        page_size: Number of articles to request per page
         from_date: Start date for article search
         to_date: End date for article search
+        max_pages: Maximum number of pages to request
 
-    Returns:
-        List of normalized article dictionaries
+    Yields:
+        Normalized article dictionaries
 
     Raises:
         RuntimeError: If NEWSAPI_KEY is not set
         ValueError: If query_terms is None
+        requests.RequestException: If the first page cannot be fetched
     """
     if NEWSAPI_KEY is None:
         raise RuntimeError("NEWSAPI_KEY is not set in .env file")
@@ -49,7 +98,7 @@ def fetch_chunk_from_newsapi(
     if query_terms is None:
         raise ValueError("query_terms cannot be None")
 
-    q_string = " OR ".join([f'"{term}"' for term in query_terms])
+    q_string = build_newsapi_query(query_terms)
 
     if to_date is None:
         to_date = datetime.now(timezone.utc).date()
@@ -57,30 +106,54 @@ def fetch_chunk_from_newsapi(
     if from_date is None:
         from_date = to_date - timedelta(days=7)
 
-    # Build URL with parameters
-    url = (
-        f"{NEWSAPI_BASE_URL}?"
-        f"q={quote_plus(q_string)}&"
-        f"from={from_date.isoformat()}&"
-        f"to={to_date.isoformat()}&"
-        f"language={DEFAULT_LANGUAGE}&"
-        f"pageSize={page_size}&"
-        f"sortBy=publishedAt&"
-        f"apiKey={NEWSAPI_KEY}"
-    )
+    params = {
+        "q": q_string,
+        "from": from_date.isoformat(),
+        "to": to_date.isoformat(),
+        "language": DEFAULT_LANGUAGE,
+        "pageSize": page_size,
+        "sortBy": "publishedAt",
+    }
 
-    try:
-        resp = requests.get(url, timeout=30)
-        resp.raise_for_status()
-        data = resp.json()
-    except requests.RequestException as e:
-        logger.error(f"NewsAPI request failed: {e}")
-        raise
-
-    normalized = []
-    for article in data.get("articles", []):
-        normalized.append(
-            {
+    global _plan_result_cap
+
+    fetched = 0
+    total_results = 0
+
+    for page in range(1, max_pages + 1):
+        if _plan_result_cap is not None and fetched >= _plan_result_cap:
+            return True
+
+        try:
+            data = get_json(
+                NEWSAPI_BASE_URL,
+                params={**params, "page": page},
+                rate_limiter=rate_limiter,
+                headers={"X-Api-Key": NEWSAPI_KEY},
+            )
+        except requests.RequestException as e:
+            if page == 1:
+                logger.error(f"NewsAPI request failed: {e}")
+                raise
+
+            if _is_result_cap(e):
+                _plan_result_cap = fetched
+                logger.info(
+                    f"NewsAPI plan result cap reached after {fetched} of "
+                    f"{total_results} results for query: {q_string}"
+                )
+                return True
+
+            logger.warning(
+                f"NewsAPI stopped at page {page} ({fetched} of {total_results}): {e}"
+            )
+            return False
+
+        articles = data.get("articles", [])
+        total_results = data.get("totalResults", 0)
+
+        for article in articles:
+            yield {
                 "source": article["source"]["name"],
                 "title": article["title"] or "",
                 "url": article["url"],
@@ -89,9 +162,57 @@ def fetch_chunk_from_newsapi(
                 "content": article.get("content") or "",
                 "fetched_from": "newsapi",
             }
-        )
 
-    return normalized
+        fetched += len(articles)
+        if not articles or fetched >= total_results:
+            return True
+
+    logger.warning(
+        f"NewsAPI results truncated at {max_pages} pages "
+        f"({fetched} of {total_results}) for query: {q_string}"
+    )
+    return False
+
+
+def fetch_chunk_from_newsapi(
+    query_terms: List[str] | None = None,
+    page_size: int = DEFAULT_PAGE_SIZE,
+    from_date: date | None = None,
+    to_date: date | None = None,
+    max_pages: int = DEFAULT_MAX_PAGES,
+) -> ChunkResult:
+    """Fetch a chunk of articles from NewsAPI.
+
+    Args:
+        query_terms: List of search terms
+        page_size: Number of articles to fetch per page
+        from_date: Start date for article search
+        to_date: End date for article search
+        max_pages: Maximum number of pages to request
+
+    Returns:
+        Normalized article dictionaries, flagged incomplete when the
+        results were cut off
+
+    Raises:
+        RuntimeError: If NEWSAPI_KEY is not set
+        ValueError: If query_terms is None
+    """
+    articles = iter_articles_from_newsapi(
+        query_terms=query_terms,
+        page_size=page_size,
+        from_date=from_date,
+        to_date=to_date,
+        max_pages=max_pages,
+    )
+    items = ChunkResult()
+
+    while True:
+        try:
+            items.append(next(articles))
+        except StopIteration as stop:
+            items.complete = stop.value
+            return items
 
 
 def fetch_all_from_newsapi(
@@ -99,17 +220,29 @@ def fetch_all_from_newsapi(
     chunk_size: int = 6,
     from_date: date | None = None,
     to_date: date | None = None,
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+    watermarks: Dict[str, str] | None = None,
+    chunks: List[List[str]] | None = None,
+    max_pages: int = DEFAULT_MAX_PAGES,
 ) -> List[Dict[str, Any]]:
     """Fetch all articles from NewsAPI using chunked queries.
 
     Splits query terms into chunks to avoid API limitations and fetches
-    articles for each chunk.
+    the chunks concurrently, bounded by max_concurrency. Individual requests
+    go through the shared transport and the module rate limiter.
 
     Args:
         query_terms: List of search terms
         chunk_size: Number of terms to include per API request
         from_date: Start date for article search
         to_date: End date for article search
+        max_concurrency: Maximum number of chunk requests in flight
+        watermarks: Per-chunk high-watermarks; when given, each chunk only
+            fetches articles newer than its watermark and the watermarks
+            are advanced in place
+        chunks: Precomputed query chunks (e.g. from the query planner);
+            overrides chunk_size when given
+        max_pages: Maximum number of result pages to follow per chunk
 
     Returns:
         List of all fetched articles
@@ -118,19 +251,30 @@ def fetch_all_from_newsapi(
 
     logger.info(f"Fetching NewsAPI (from {from_date} to {to_date})...")
 
-    for chunk in chunk_list(query_terms, chunk_size):
-        try:
-            items = fetch_chunk_from_newsapi(
-                query_terms=chunk,
-                from_date=from_date,
-                to_date=to_date,
-                page_size=DEFAULT_PAGE_SIZE,
-            )
-            all_newsapi_items.extend(items)
-            logger.debug(f"Fetched {len(items)} articles from chunk")
+    if chunks is None:
+        chunks = list(chunk_list(query_terms, chunk_size))
+    chunk_kwargs = None
+
+    if watermarks is not None and from_date is not None:
+        chunk_kwargs = resume_points(watermarks, "newsapi", chunks, from_date)
+
+    chunk_results = run_chunks_concurrently(
+        fetch_chunk_from_newsapi,
+        chunks,
+        max_concurrency=max_concurrency,
+        chunk_kwargs=chunk_kwargs,
+        label="NewsAPI",
+        from_date=from_date,
+        to_date=to_date,
+        page_size=DEFAULT_PAGE_SIZE,
+        max_pages=max_pages,
+    )
+
+    for items in chunk_results:
+        all_newsapi_items.extend(items)
 
-        except Exception as e:
-            logger.error(f"NewsAPI chunk error: {e}")
+    if watermarks is not None:
+        advance_watermarks(watermarks, "newsapi", chunks, chunk_results)
 
     logger.info(f"Total NewsAPI articles fetched: {len(all_newsapi_items)}")
 
@@ -0,0 +1,214 @@
+"""Yield-aware query planning from archived article statistics.
+
+Instead of slicing the term list in file order, terms are packed into
+requests by how many articles each one historically returns, so that
+high-yield terms do not saturate a shared request and low-yield terms do
+not waste requests of their own.
+"""
+
+import logging
+from typing import Callable, Dict, List
+
+import pandas as pd
+
+from archive_store import iter_article_batches
+from fetchers.gdelt_fetcher import DEFAULT_MAX_RECORDS, build_gdelt_query
+from fetchers.newsapi_fetcher import DEFAULT_PAGE_SIZE, build_newsapi_query
+from helper_functions import chunk_list
+
+logger = logging.getLogger(__name__)
+
+# Constants
+TEXT_COLUMNS = ["title", "url", "description", "content", "fetched_from"]
+TARGET_FILL_RATIO = 0.8
+UNKNOWN_TERM_YIELD = 1.0
+SOURCE_LIMITS = {
+    "newsapi": {
+        "capacity": DEFAULT_PAGE_SIZE,
+        "max_query_length": 500,
+        "build_query": build_newsapi_query,
+    },
+    "gdelt": {
+        "capacity": DEFAULT_MAX_RECORDS,
+        "max_query_length": 250,
+        "build_query": build_gdelt_query,
+    },
+}
+
+
+def _searchable_text(archived: pd.DataFrame) -> pd.Series:
+    """Lower-cased text each archived row was most likely matched on.
+
+    GDELT rows only carry a real title (description and content hold the
+    domain and seen date), so only the title is used for them.
+    """
+    title = archived["title"].fillna("")
+    description = archived["description"].fillna("")
+    content = archived["content"].fillna("")
+
+    full_text = title + " " + description + " " + content
+    text = full_text.where(archived["fetched_from"] != "gdelt", title)
+
+    return text.str.lower()
+
+
+def compute_term_statistics(query_terms: List[str]) -> pd.DataFrame:
+    """Estimate per-term yield and unique contribution from archived runs.
+
+    Yield is the mean number of archived articles per run, per source, whose
+    text contains the term. An article contributes uniquely to a term when
+    no other query term matches it.
+
+    Args:
+        query_terms: List of search terms
+
+    Returns:
+        DataFrame indexed by term with '<source>_yield', 'matched_articles'
+        and 'unique_articles' columns (empty if there are no archives)
+    """
+    frames = list(iter_article_batches("all_articles", columns=TEXT_COLUMNS))
+
+    if not frames:
+        return pd.DataFrame()
+
+    archived = pd.concat(frames, ignore_index=True)
+    archived["text"] = _searchable_text(archived)
+
+    matches = pd.DataFrame(
+        {
+            term: archived["text"].str.contains(term.lower(), regex=False)
+            for term in query_terms
+        }
+    )
+
+    stats = pd.DataFrame(index=pd.Index(query_terms, name="term"))
+
+    for source in SOURCE_LIMITS:
+        from_source = archived["fetched_from"] == source
+        per_run = matches[from_source].groupby(
+            archived.loc[from_source, "archive_date"]
+        )
+        stats[f"{source}_yield"] = per_run.sum().mean() if from_source.any() else 0.0
+
+    unique_rows = ~archived.duplicated(subset="url")
+    article_matches = matches[unique_rows]
+    single_match = article_matches.sum(axis=1) == 1
+
+    stats["matched_articles"] = article_matches.sum()
+    stats["unique_articles"] = article_matches[single_match].sum()
+
+    return stats
+
+
+def pack_terms(
+    query_terms: List[str],
+    term_yields: Dict[str, float],
+    capacity: int,
+    max_query_length: int,
+    build_query: Callable[[List[str]], str],
+) -> List[List[str]]:
+    """Pack terms into requests using first-fit decreasing by expected yield.
+
+    Each request is filled up to TARGET_FILL_RATIO of the per-request
+    result cap. Terms expected to saturate a request on their own get a
+    dedicated request.
+
+    Args:
+        query_terms: List of search terms
+        term_yields: Expected articles per term
+        capacity: Maximum results returned by one request
+        max_query_length: Maximum length of the built query string
+        build_query: Function building the source's query string
+
+    Returns:
+        Query term chunks, one request per chunk
+    """
+    target = capacity * TARGET_FILL_RATIO
+    expected = {
+        term: term_yields.get(term) or UNKNOWN_TERM_YIELD for term in query_terms
+    }
+
+    requests_planned: List[List[str]] = []
+    loads: List[float] = []
+
+    for term in sorted(query_terms, key=lambda t: expected[t], reverse=True):
+        for i, planned in enumerate(requests_planned):
+            if (
+                loads[i] + expected[term] <= target
+                and len(build_query(planned + [term])) <= max_query_length
+            ):
+                planned.append(term)
+                loads[i] += expected[term]
+                break
+        else:
+            requests_planned.append([term])
+            loads.append(expected[term])
+
+    return requests_planned
+
+
+def find_unproductive_terms(stats: pd.DataFrame) -> List[str]:
+    """List terms that never contributed an article no other term matched.
+
+    Args:
+        stats: Term statistics from compute_term_statistics
+
+    Returns:
+        Terms with no unique archived articles
+    """
+    if stats.empty:
+        return []
+
+    return stats.index[stats["unique_articles"] == 0].tolist()
+
+
+def plan_queries(
+    query_terms: List[str], fallback_chunk_size: int = 6
+) -> Dict[str, List[List[str]]]:
+    """Build per-source request plans from archived term yields.
+
+    Falls back to fixed-size chunks when there are no archives to learn
+    from.
+
+    Args:
+        query_terms: List of search terms
+        fallback_chunk_size: Chunk size used without archive statistics
+
+    Returns:
+        Mapping of source name to its query term chunks
+    """
+    query_terms = list(dict.fromkeys(query_terms))
+    stats = compute_term_statistics(query_terms)
+
+    if stats.empty:
+        logger.warning("No archived articles found; using fixed-size query chunks")
+        fixed_chunks = list(chunk_list(query_terms, fallback_chunk_size))
+        return {source: fixed_chunks for source in SOURCE_LIMITS}
+
+    plans = {}
+    for source, limits in SOURCE_LIMITS.items():
+        plans[source] = pack_terms(
+            query_terms,
+            stats[f"{source}_yield"].to_dict(),
+            capacity=limits["capacity"],
+            max_query_length=limits["max_query_length"],
+            build_query=limits["build_query"],
+        )
+        saturated = sum(
+            1
+            for chunk in plans[source]
+            if stats.loc[chunk, f"{source}_yield"].sum() >= limits["capacity"]
+        )
+        logger.info(
+            f"Planned {len(plans[source])} {source} requests for "
+            f"{len(query_terms)} terms ({saturated} expected to saturate)"
+        )
+
+    unproductive = find_unproductive_terms(stats)
+    if unproductive:
+        logger.info(
+            f"{len(unproductive)} terms never contributed a unique archived "
+            f"article: {', '.join(unproductive)}"
+        )
+
+    return plans
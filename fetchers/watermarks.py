@@ -0,0 +1,161 @@
+"""Per-chunk high-watermarks for incremental fetching."""
+
+import json
+import logging
+from datetime import date, datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, List
+
+from disk_cache import DEFAULT_CACHE_DIR
+
+logger = logging.getLogger(__name__)
+
+# Constants
+WATERMARKS_PATH = DEFAULT_CACHE_DIR / "watermarks.json"
+
+
+class ChunkResult(list):
+    """Articles fetched for one query chunk.
+
+    ``complete`` is False when the source returned only part of the matches
+    in the window (results cut off at a page limit, a failed later page, a
+    window still saturated at the minimum size). The missing articles can
+    be older than the ones returned, so such a chunk must not advance its
+    watermark.
+    """
+
+    def __init__(
+        self, items: Iterable[Dict[str, Any]] = (), complete: bool = True
+    ) -> None:
+        super().__init__(items)
+        self.complete = complete
+
+
+def chunk_key(source: str, query_terms: List[str]) -> str:
+    """Build a stable identifier for a query chunk of a source.
+
+    Args:
+        source: Source name (e.g. 'newsapi' or 'gdelt')
+        query_terms: Terms queried together in one request
+
+    Returns:
+        Key independent of term order and case
+    """
+    return f"{source}:" + "|".join(sorted(term.lower() for term in query_terms))
+
+
+def parse_published_at(value: str) -> datetime | None:
+    """Parse a normalized ISO 8601 'published_at' value as naive UTC.
+
+    Args:
+        value: Timestamp string such as '2025-10-20T14:38:00Z'
+
+    Returns:
+        Naive UTC datetime, or None if the value is empty or malformed
+    """
+    try:
+        parsed = datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        return None
+
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+
+    return parsed
+
+
+def load_watermarks(path: Path = WATERMARKS_PATH) -> Dict[str, str]:
+    """Load stored watermarks.
+
+    Args:
+        path: Watermarks JSON file
+
+    Returns:
+        Mapping of chunk key to newest stored 'published_at'
+    """
+    if not path.exists():
+        return {}
+
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_watermarks(watermarks: Dict[str, str], path: Path = WATERMARKS_PATH) -> None:
+    """Persist watermarks.
+
+    Args:
+        watermarks: Mapping of chunk key to newest stored 'published_at'
+        path: Watermarks JSON file
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(watermarks, f, indent=2, sort_keys=True)
+
+
+def resume_points(
+    watermarks: Dict[str, str],
+    source: str,
+    chunks: List[List[str]],
+    from_date: date,
+) -> List[Dict[str, Any]]:
+    """Compute the start of the fetch window for each chunk.
+
+    Chunks with a watermark inside the requested window resume from that
+    watermark; all others use the full window.
+
+    Args:
+        watermarks: Stored watermarks
+        source: Source name
+        chunks: Query term chunks
+        from_date: Start of the requested window
+
+    Returns:
+        Per-chunk keyword overrides holding the 'from_date' to use
+    """
+    window_start = datetime.combine(from_date, datetime.min.time())
+    overrides = []
+
+    for chunk in chunks:
+        watermark = parse_published_at(watermarks.get(chunk_key(source, chunk), ""))
+
+        if watermark is not None and watermark > window_start:
+            overrides.append({"from_date": watermark})
+        else:
+            overrides.append({"from_date": from_date})
+
+    return overrides
+
+
+def advance_watermarks(
+    watermarks: Dict[str, str],
+    source: str,
+    chunks: List[List[str]],
+    chunk_results: List[List[Dict[str, Any]]],
+) -> None:
+    """Move each chunk's watermark to the newest article it returned.
+
+    Chunks whose results are incomplete (see ChunkResult) keep their
+    watermark, so the next incremental run fetches their window again.
+
+    Args:
+        watermarks: Watermarks to update in place
+        source: Source name
+        chunks: Query term chunks
+        chunk_results: Articles fetched for each chunk, in chunk order
+    """
+    for chunk, items in zip(chunks, chunk_results):
+        key = chunk_key(source, chunk)
+
+        if not getattr(items, "complete", True):
+            logger.info(f"Keeping watermark of {key}: results were incomplete")
+            continue
+        newest = parse_published_at(watermarks.get(key, ""))
+
+        for item in items:
+            published = parse_published_at(item.get("published_at", ""))
+            if published is not None and (newest is None or published > newest):
+                newest = published
+
+        if newest is not None:
+            watermarks[key] = newest.strftime("%Y-%m-%dT%H:%M:%SZ")
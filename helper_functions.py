@@ -1,9 +1,112 @@
 """Helper utility functions for article processing."""
 
+import random
+import re
+import threading
+import time
 from typing import Generator, List, Dict, Any
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
 
 import pandas as pd
 
+# Constants
+ARTICLE_COLUMNS = [
+    "source",
+    "title",
+    "url",
+    "published_at",
+    "description",
+    "content",
+    "fetched_from",
+]
+CATEGORICAL_COLUMNS = ["source", "fetched_from"]
+TIMESTAMP_FORMATS = {
+    "newsapi": "ISO8601",
+    "gdelt": "%Y-%m-%dT%H:%M:%SZ",
+}
+TRACKING_PARAM_PREFIXES = ("utm_", "fbclid", "gclid", "mc_cid", "mc_eid")
+
+
+class TokenBucket:
+    """Thread-safe token-bucket rate limiter.
+
+    Tokens refill continuously at ``rate`` per second up to ``capacity``.
+    Callers block in ``acquire`` until enough tokens are available, which
+    allows short bursts while holding the long-run rate steady.
+    """
+
+    def __init__(self, rate: float, capacity: float | None = None) -> None:
+        """Initialize the bucket.
+
+        Args:
+            rate: Tokens added per second
+            capacity: Maximum number of stored tokens (defaults to rate)
+
+        Raises:
+            ValueError: If rate or capacity is not positive
+        """
+        if capacity is None:
+            capacity = max(rate, 1.0)
+
+        if rate <= 0 or capacity <= 0:
+            raise ValueError("rate and capacity must be positive")
+
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._last_refill = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens: float = 1.0) -> None:
+        """Block until the requested number of tokens can be taken.
+
+        Args:
+            tokens: Number of tokens to consume
+        """
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                elapsed = now - self._last_refill
+                self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+                self._last_refill = now
+
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+
+                wait = (tokens - self._tokens) / self.rate
+
+            time.sleep(wait)
+
+
+def backoff_delay(attempt: int, base: float = 1.0, cap: float = 30.0) -> float:
+    """Compute a jittered exponential backoff delay.
+
+    Uses "full jitter": a uniform draw between zero and the exponential
+    ceiling, which spreads out retries from concurrent workers.
+
+    Args:
+        attempt: Zero-based retry attempt number
+        base: Delay ceiling for the first retry, in seconds
+        cap: Upper bound on the delay ceiling, in seconds
+
+    Returns:
+        Number of seconds to sleep before retrying
+    """
+    return random.uniform(0, min(cap, base * 2**attempt))
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into lower-cased word tokens.
+
+    Args:
+        text: Text to tokenize
+
+    Returns:
+        List of alphanumeric tokens
+    """
+    return re.findall(r"\w+", text.lower())
+
 
 def chunk_list(lst: List[Any], chunk_size: int = 6) -> Generator[List[Any], None, None]:
     """Split a list into chunks of specified size.
@@ -19,13 +122,48 @@ def chunk_list(lst: List[Any], chunk_size: int = 6) -> Generator[List[Any], None
         yield lst[i : i + chunk_size]
 
 
+def canonicalize_url(url: str) -> str:
+    """Reduce a URL to a canonical form for duplicate detection.
+
+    Lower-cases the scheme and host, treats http and https as equal, drops
+    a leading 'www.', default ports, fragments, tracking parameters and
+    trailing slashes, and sorts the remaining query parameters.
+
+    Args:
+        url: URL to canonicalize
+
+    Returns:
+        Canonical URL (the input unchanged if it cannot be parsed)
+    """
+    try:
+        parts = urlsplit(url.strip())
+    except ValueError:
+        return url
+
+    host = (parts.hostname or "").removeprefix("www.")
+    if parts.port and parts.port not in (80, 443):
+        host = f"{host}:{parts.port}"
+
+    query = urlencode(
+        sorted(
+            (key, value)
+            for key, value in parse_qsl(parts.query, keep_blank_values=True)
+            if not key.lower().startswith(TRACKING_PARAM_PREFIXES)
+        )
+    )
+
+    return urlunsplit(("https", host, parts.path.rstrip("/"), query, ""))
+
+
 def normalize_and_merge(
     news_items: List[Dict[str, Any]], gdelt_items: List[Dict[str, Any]]
 ) -> pd.DataFrame:
     """Normalize and merge articles from different sources.
 
-    Combines articles from NewsAPI and GDELT, removes duplicates,
-    and sorts by publication date.
+    Builds the frame column by column from the fetched items, parses each
+    source's timestamps with its known format, removes duplicates by
+    canonical URL (keeping the newest copy) and sorts by publication date.
+    'source' and 'fetched_from' are stored as categoricals.
 
     Args:
         news_items: Articles from NewsAPI
@@ -35,10 +173,29 @@ def normalize_and_merge(
         DataFrame with normalized and deduplicated articles
     """
     combined = news_items + gdelt_items
+    columns = {
+        column: [item.get(column) or "" for item in combined]
+        for column in ARTICLE_COLUMNS
+    }
+
+    df = pd.DataFrame(columns)
+    df["published_at_parsed"] = pd.Series(
+        pd.NaT, index=df.index, dtype="datetime64[ns, UTC]"
+    )
+
+    for fetched_from, rows in df.groupby("fetched_from").groups.items():
+        df.loc[rows, "published_at_parsed"] = pd.to_datetime(
+            df.loc[rows, "published_at"],
+            format=TIMESTAMP_FORMATS.get(fetched_from, "ISO8601"),
+            errors="coerce",
+            utc=True,
+        )
+
+    for column in CATEGORICAL_COLUMNS:
+        df[column] = df[column].astype("category")
 
-    df = pd.DataFrame(combined)
-    df["published_at_parsed"] = pd.to_datetime(df["published_at"], errors="coerce")
-    df = df.sort_values("published_at_parsed", ascending=False)
-    df = df.drop_duplicates(subset="url", keep="first")
+    canonical_urls = df["url"].map(canonicalize_url)
+    df = df.sort_values("published_at_parsed", ascending=False, kind="stable")
+    df = df[~canonical_urls.loc[df.index].duplicated(keep="first")]
 
-    return df.sort_values("published_at_parsed", ascending=False).reset_index(drop=True)
+    return df.reset_index(drop=True)
@@ -8,6 +8,7 @@ from email.mime.image import MIMEImage
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
 from pathlib import Path
+from typing import Generator, Tuple
 
 import pandas as pd
 import pyperclip
@@ -28,6 +29,26 @@ COMPANY_LOGO_PATH = "logos/bsd_logo.png"
 COMPANY_LOGO_CID = "bsd_logo"
 
 
+def _sectioned_rows(
+    df: pd.DataFrame,
+) -> Generator[Tuple[str | None, pd.Series], None, None]:
+    """Yield (section heading or None, row) pairs for the digest articles.
+
+    A heading is yielded with the first article of each topic, and only when
+    the digest has more than one topic section.
+    """
+    sectioned = "topic" in df.columns and df["topic"].nunique() > 1
+    previous_topic = None
+
+    for _, row in df.iterrows():
+        heading = None
+        if sectioned and row["topic"] != previous_topic:
+            heading = row["topic"]
+            previous_topic = row["topic"]
+
+        yield heading, row
+
+
 def create_email_body(df: pd.DataFrame) -> str:
 
     return f"""
@@ -115,9 +136,17 @@ def create_email_body(df: pd.DataFrame) -> str:
                   </td>
                 </tr>
 
-                <!-- articles w/ bone emoji + gold stripe -->
+                <!-- articles w/ bone emoji + gold stripe, sectioned by topic -->
                 {"".join([
-                  f'''
+                  (f'''
+                  <tr>
+                    <td style="padding:10px 20px 15px;">
+                      <h2 style="margin:0; color:{HEADING_COLOR}; font-size:24px; font-weight:700;">
+                        {heading}
+                      </h2>
+                    </td>
+                  </tr>
+                  ''' if heading else "") + f'''
                   <tr>
                     <td style="padding:0 20px 20px;">
                       <table width="100%" cellpadding="0" cellspacing="0" style="
@@ -145,7 +174,7 @@ def create_email_body(df: pd.DataFrame) -> str:
                       </table>
                     </td>
                   </tr>
-                  ''' for _, row in df.iterrows()
+                  ''' for heading, row in _sectioned_rows(df)
                 ])}
 
                 <!-- company logo footer -->
@@ -190,6 +219,9 @@ def create_email_body_CRM(df: pd.DataFrame, HEADING_COLOR: str = "#0056b3") -> s
     sub_headline_td_style = "padding-top:0; padding-right:20px; padding-bottom:30px; padding-left:20px; text-align:center;"
     sub_headline_p_style = "margin-top:0; margin-right:0; margin-bottom:0; margin-left:0; color:#132770; font-size:16px; line-height:1.5;"
 
+    section_heading_td_style = "padding-top:10px; padding-right:20px; padding-bottom:15px; padding-left:20px; text-align:left;"
+    section_heading_h2_style = f"margin-top:0; margin-right:0; margin-bottom:0; margin-left:0; color:{HEADING_COLOR}; font-size:24px; font-weight:700; line-height:1.2;"
+
     article_td_outer_style = (
         "padding-top:0; padding-right:20px; padding-bottom:20px; padding-left:20px;"
     )
@@ -233,7 +265,15 @@ def create_email_body_CRM(df: pd.DataFrame, HEADING_COLOR: str = "#0056b3") -> s
                 </tr>
 
                 {"".join([
-                  f'''
+                  (f'''
+                  <tr>
+                    <td style="{section_heading_td_style}">
+                      <h2 style="{section_heading_h2_style}">
+                        {heading}
+                      </h2>
+                    </td>
+                  </tr>
+                  ''' if heading else "") + f'''
                   <tr>
                     <td style="{article_td_outer_style}">
                       <table border="0" cellpadding="0" cellspacing="0" role="presentation" style="{article_table_style}" width="100%">
@@ -255,7 +295,7 @@ def create_email_body_CRM(df: pd.DataFrame, HEADING_COLOR: str = "#0056b3") -> s
                       </table>
                     </td>
                   </tr>
-                  ''' for _, row in df.iterrows()
+                  ''' for heading, row in _sectioned_rows(df)
                 ])}
               </table>
               
@@ -286,7 +326,7 @@ def export_standalone_html(
     return filepath
 
 
-def send_news_email(df: pd.DataFrame, recipient_email: str):
+def send_news_email(df: pd.DataFrame, recipient_email: str) -> bool:
 
     sender_email = GMAIL_EMAIL_ADDRESS
     sender_password = GMAIL_APP_PASSWORD
@@ -338,3 +378,6 @@ def send_news_email(df: pd.DataFrame, recipient_email: str):
 
         except Exception as e:
             print(f"failed to send email: {e}")
+            return False
+
+    return True
@@ -0,0 +1,124 @@
+"""Cheap lexical candidate selection ahead of embedding-based ranking.
+
+Articles are scored against each topic query with BM25 over their title and
+description, computed for all articles at once on a sparse term matrix.
+Only the best lexical matches of each topic are passed on to the sentence
+transformer, so clearly off-topic articles cost no encoding time.
+
+The prefilter is off by default: articles sharing no term with a topic
+query are dropped, so a limit should first be checked against ranking
+every article with the compare-prefilter command.
+"""
+
+import logging
+from typing import List
+
+import numpy as np
+import pandas as pd
+from sklearn.feature_extraction.text import CountVectorizer
+
+from search_index import BM25_B, BM25_K1
+
+logger = logging.getLogger(__name__)
+
+# Constants
+DEFAULT_LEXICAL_CANDIDATES = 0
+
+
+def bm25_scores(texts: List[str], queries: List[str]) -> np.ndarray:
+    """Score every text against every query with BM25.
+
+    Term statistics are computed over the given texts, so scores are only
+    comparable within one call.
+
+    Args:
+        texts: Documents to score
+        queries: Queries to score them against
+
+    Returns:
+        Array of shape (len(texts), len(queries))
+    """
+    vectorizer = CountVectorizer(stop_words="english", dtype=np.float32)
+    try:
+        counts = vectorizer.fit_transform(texts).tocsr()
+    except ValueError:
+        # No text has a single non-stop-word term
+        return np.zeros((len(texts), len(queries)), dtype=np.float32)
+
+    num_docs = counts.shape[0]
+    doc_freq = np.bincount(counts.indices, minlength=counts.shape[1])
+    idf = np.log1p((num_docs - doc_freq + 0.5) / (doc_freq + 0.5)).astype(np.float32)
+
+    # Saturate term frequencies in place of the raw counts
+    lengths = np.asarray(counts.sum(axis=1)).ravel()
+    norms = BM25_K1 * (1 - BM25_B + BM25_B * lengths / max(lengths.mean(), 1.0))
+    row_norms = np.repeat(norms, np.diff(counts.indptr))
+    tf = counts.data
+    counts.data = idf[counts.indices] * tf * (BM25_K1 + 1) / (tf + row_norms)
+
+    query_terms = vectorizer.transform(queries)
+    query_terms.data[:] = 1
+
+    return np.asarray((counts @ query_terms.T).todense(), dtype=np.float32)
+
+
+def select_candidates(
+    texts: List[str],
+    queries: List[str],
+    per_query: int = DEFAULT_LEXICAL_CANDIDATES,
+) -> np.ndarray:
+    """Pick the positions of the best lexical matches of each query.
+
+    Args:
+        texts: Article texts (title and description)
+        queries: Topic queries
+        per_query: Number of candidates kept per query (0 keeps all)
+
+    Returns:
+        Sorted positions of the union of every query's top matches; all
+        positions when there are few articles or no text matches any query
+    """
+    if per_query <= 0 or len(texts) <= per_query:
+        return np.arange(len(texts))
+
+    scores = bm25_scores(texts, queries)
+    selected = set()
+
+    for column in scores.T:
+        matching = np.flatnonzero(column > 0)
+        if len(matching) > per_query:
+            top = np.argpartition(-column[matching], per_query - 1)[:per_query]
+            matching = matching[top]
+
+        selected.update(matching.tolist())
+
+    if not selected:
+        logger.warning("No article matches the topic queries lexically; keeping all")
+        return np.arange(len(texts))
+
+    return np.array(sorted(selected))
+
+
+def prefilter_articles(
+    df: pd.DataFrame,
+    queries: List[str],
+    per_query: int = DEFAULT_LEXICAL_CANDIDATES,
+) -> pd.DataFrame:
+    """Keep only the best lexical matches of each query.
+
+    Args:
+        df: Articles with 'title' and 'description' columns
+        queries: Topic queries
+        per_query: Number of candidates kept per query
+
+    Returns:
+        Subset of df (original index preserved)
+    """
+    texts = (df["title"].fillna("") + " " + df["description"].fillna("")).tolist()
+    candidates = select_candidates(texts, queries, per_query)
+
+    logger.info(
+        f"Lexical prefilter kept {len(candidates)} of {len(df)} articles "
+        f"for {len(queries)} topics"
+    )
+    return df.iloc[candidates]
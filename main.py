@@ -11,22 +11,70 @@ import json
 import logging
 import os
 import sys
+import threading
 import time
-from datetime import datetime, timedelta, timezone
+from datetime import date, datetime, timedelta, timezone
+from functools import partial
 from pathlib import Path
+from typing import Dict, List
 
 import pandas as pd
 
+from archive_store import (
+    COMPACTION_PERIODS,
+    DEFAULT_RETENTION_DAYS,
+    apply_retention,
+    compact_archives,
+    load_archived_articles,
+    load_articles,
+    migrate_legacy_archives,
+    write_articles,
+)
+from article_extraction import DEFAULT_EXTRACTION_WORKERS, extract_full_text
+from featured_index import FeaturedIndex
+from fetchers.fetch_engine import fetch_all_sources
 from fetchers.gdelt_fetcher import fetch_all_from_gdelt
+from fetchers.http_transport import (
+    configure_response_cache,
+    log_transport_stats,
+    prune_response_cache,
+)
 from fetchers.newsapi_fetcher import fetch_all_from_newsapi
+from fetchers.query_planner import plan_queries
+from fetchers.replay_fetcher import fetch_all_from_replay
+from fetchers.watermarks import load_watermarks, save_watermarks
 from helper_functions import normalize_and_merge
 from html_and_email_functions import (
     RECIPIENT_EMAIL,
     export_standalone_html,
     send_news_email,
 )
-from semantic_similarity import filter_articles, get_relevant_articles
-from summarize_articles import summarize_article_gemini
+from near_duplicates import collapse_near_duplicates
+from search_index import DEFAULT_SEARCH_LIMIT, SearchIndex
+from lexical_prefilter import DEFAULT_LEXICAL_CANDIDATES
+from ranking_evaluation import compare_backends, compare_prefilter
+from semantic_similarity import (
+    DEFAULT_BACKEND,
+    DEFAULT_BATCH_SIZE,
+    DEFAULT_EMBEDDING_WORKERS,
+    DEFAULT_RERANK_CANDIDATES,
+    ENCODER_BACKENDS,
+    configure_encoder,
+    encode_query,
+    filter_articles,
+    get_embedding_store,
+    get_relevant_articles,
+    warm_up_model,
+)
+from summarize_articles import (
+    DEFAULT_REQUESTS_PER_MINUTE,
+    DEFAULT_SUMMARY_BATCH_SIZE,
+    DEFAULT_SUMMARY_TIMEOUT,
+    DEFAULT_SUMMARY_WORKERS,
+    configure_summary_cache,
+    summarize_articles,
+)
+from vector_index import DEFAULT_TOP_K, VECTOR_INDEX_DIR, VectorIndex
 
 # Configure logging
 logging.basicConfig(
@@ -35,6 +83,11 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Constants
+REPLAY_OUTPUT_DIR = "replay_output"
+DEFAULT_TOPICS_PATH = Path("query_terms/topics.json")
+HTML_ARCHIVE_DIR = Path("archives_html")
+
 
 def load_query_terms(query_terms_length: str) -> list:
     """Load query terms from JSON file.
@@ -60,104 +113,460 @@ def load_query_terms(query_terms_length: str) -> list:
         return json.load(f)
 
 
+def load_topics(topics_path: Path = DEFAULT_TOPICS_PATH) -> Dict[str, str]:
+    """Load the named topic queries the digest is ranked against.
+
+    Args:
+        topics_path: JSON file mapping section titles to topic queries
+
+    Returns:
+        Mapping of topic name to topic query, in file order
+
+    Raises:
+        FileNotFoundError: If the topics file doesn't exist
+        ValueError: If the file defines no topics
+    """
+    if not topics_path.exists():
+        raise FileNotFoundError(f"Topics file not found: {topics_path}")
+
+    with open(topics_path, "r", encoding="utf-8") as f:
+        topics = json.load(f)
+
+    if not topics:
+        raise ValueError(f"No topics defined in {topics_path}")
+
+    return topics
+
+
 def main(
-    days: int = 6, article_count: int = 10, query_terms_length: str = "short"
+    days: int = 6,
+    article_count: int = 10,
+    query_terms_length: str = "short",
+    use_cache: bool = True,
+    cache_ttl_hours: float = 24.0,
+    incremental: bool = False,
+    plan_query_chunks: bool = False,
+    end_date: date | None = None,
+    replay: bool = False,
+    replay_latency: float = 0.0,
+    allow_repeats: bool = False,
+    encoder_backend: str = DEFAULT_BACKEND,
+    embedding_batch_size: int = DEFAULT_BATCH_SIZE,
+    embedding_workers: int = DEFAULT_EMBEDDING_WORKERS,
+    topics_path: Path = DEFAULT_TOPICS_PATH,
+    lexical_candidates: int = DEFAULT_LEXICAL_CANDIDATES,
+    rerank_candidates: int = DEFAULT_RERANK_CANDIDATES,
+    full_text: bool = True,
+    extraction_workers: int = DEFAULT_EXTRACTION_WORKERS,
+    summary_workers: int = DEFAULT_SUMMARY_WORKERS,
+    gemini_rpm: float = DEFAULT_REQUESTS_PER_MINUTE,
+    summary_timeout: float = DEFAULT_SUMMARY_TIMEOUT,
+    use_summary_cache: bool = True,
+    summary_batch_size: int = DEFAULT_SUMMARY_BATCH_SIZE,
 ) -> None:
     """Main execution function for Archie's digest.
 
     Args:
         days: Number of days to look back for articles
-        article_count: Number of top articles to include in digest
+        article_count: Number of top articles per topic section of the digest
         query_terms_length: Which query terms file to use ('short' or 'long')
+        use_cache: Whether to reuse cached NewsAPI/GDELT responses
+        cache_ttl_hours: Maximum age of a cached API response
+        incremental: Only fetch articles newer than each query chunk's
+            watermark and merge them with the archived articles (bypasses
+            the response cache)
+        plan_query_chunks: Pack query terms into requests by their archived
+            yield instead of fixed chunks of six
+        end_date: Last day of the window (defaults to today, UTC)
+        replay: Serve articles from the archives instead of the live APIs
+            and summaries from the summary cache instead of Gemini; nothing
+            is archived or emailed and the HTML digest is written to
+            REPLAY_OUTPUT_DIR
+        replay_latency: Simulated seconds per request in replay mode
+        allow_repeats: Keep articles that were already featured in a
+            previously sent digest
+        encoder_backend: Inference backend for article embeddings
+        embedding_batch_size: Number of texts per embedding forward pass
+        embedding_workers: Number of processes encoding article embeddings
+        topics_path: JSON file of named topic queries, one digest section each
+        lexical_candidates: Articles per topic kept by the BM25 prefilter
+            before embedding (0 embeds every article)
+        rerank_candidates: Articles per topic reranked with the
+            cross-encoder (0 disables reranking)
+        full_text: Download the pages of the top articles and summarize
+            their extracted main text instead of the truncated API content
+            (replays only use pages that are already cached)
+        extraction_workers: Number of pages downloaded concurrently
+        summary_workers: Maximum number of Gemini calls in flight
+        gemini_rpm: Gemini requests-per-minute quota shared by all calls
+        summary_timeout: Timeout of a single Gemini call in seconds
+        use_summary_cache: Whether to reuse summaries of articles already
+            summarized by earlier runs
+        summary_batch_size: Number of articles packed into one Gemini
+            request (1 sends one request per article)
 
     Raises:
         RuntimeError: If required environment variables are not set
     """
     try:
-        # Load query terms
+        # Load query terms and ranking topics
         query_terms = load_query_terms(query_terms_length)
-
-        # Setup output directories
-        output_dir_archives_all_articles = Path("archives_all_articles")
-        output_dir_archives_all_articles.mkdir(exist_ok=True)
-
-        output_dir_archives_top_articles = Path("archives_top_articles")
-        output_dir_archives_top_articles.mkdir(exist_ok=True)
+        topics = load_topics(topics_path)
 
         # Setup dates
         timestamp = datetime.now().strftime("%Y-%m-%d")
-        to_date = datetime.now(timezone.utc).date()
+        to_date = end_date or datetime.now(timezone.utc).date()
         from_date = to_date - timedelta(days=days)
 
+        if replay:
+            timestamp = to_date.isoformat()
+            incremental = False
+            logger.info("Replay mode: reading archived articles, no network fetch")
+
         logger.info(f"Fetching articles from {from_date} to {to_date} ({days} days)")
         logger.info(f"Using query terms: {query_terms_length}")
-        logger.info(f"Will select top {article_count} articles")
-
-        # Fetch articles from multiple sources
-        all_newsapi_items = fetch_all_from_newsapi(
-            query_terms=query_terms, chunk_size=6, from_date=from_date, to_date=to_date
+        logger.info(
+            f"Will select top {article_count} articles for each of "
+            f"{len(topics)} topics"
         )
 
-        all_gdelt_items = fetch_all_from_gdelt(
-            query_terms=query_terms, chunk_size=6, from_date=from_date, to_date=to_date
+        # Incremental runs want what is new since the watermark, which a
+        # cached response for the same window would hide until it expires
+        configure_response_cache(
+            enabled=use_cache and not incremental, ttl_hours=cache_ttl_hours
         )
+        configure_summary_cache(enabled=use_summary_cache)
+
+        # Load the embedding model while the articles are being fetched
+        configure_encoder(encoder_backend, embedding_batch_size, embedding_workers)
+        threading.Thread(
+            target=warm_up_model, args=(list(topics.values()),), daemon=True
+        ).start()
+
+        watermarks = load_watermarks() if incremental else None
+
+        source_kwargs = {}
+        if plan_query_chunks:
+            plans = plan_queries(query_terms)
+            source_kwargs = {
+                source: {"chunks": chunks} for source, chunks in plans.items()
+            }
+
+        if replay:
+            source_fetchers = {
+                source: partial(
+                    fetch_all_from_replay, source=source, latency=replay_latency
+                )
+                for source in ("newsapi", "gdelt")
+            }
+        else:
+            source_fetchers = {
+                "newsapi": fetch_all_from_newsapi,
+                "gdelt": fetch_all_from_gdelt,
+            }
+
+        # Fetch articles from multiple sources concurrently
+        source_items = fetch_all_sources(
+            source_fetchers,
+            source_kwargs=source_kwargs,
+            query_terms=query_terms,
+            chunk_size=6,
+            from_date=from_date,
+            to_date=to_date,
+            watermarks=watermarks,
+        )
+        log_transport_stats()
+
+        if incremental:
+            archived_items = load_archived_articles(from_date, to_date)
+            logger.info(f"Merging {len(archived_items)} archived articles")
+
+            for item in archived_items:
+                source_items.setdefault(item["fetched_from"], []).append(item)
 
         # Normalize and merge articles
-        df = normalize_and_merge(all_newsapi_items, all_gdelt_items)
+        df = normalize_and_merge(source_items["newsapi"], source_items["gdelt"])
         logger.info(f"Total articles fetched: {len(df)}")
 
         # Save all articles
-        all_articles_path = (
-            output_dir_archives_all_articles / f"all_articles_{timestamp}.csv"
-        )
-        df.to_csv(all_articles_path, index=True)
-        logger.info(f"Saved all articles to {all_articles_path}")
+        if not replay:
+            all_articles_path = write_articles(
+                df, "all_articles", date.fromisoformat(timestamp)
+            )
+            logger.info(f"Saved all articles to {all_articles_path}")
+
+        # Only advance watermarks once the fetched rows are archived
+        if watermarks is not None:
+            save_watermarks(watermarks)
 
         # Filter and rank articles
-        query = "data procurement and data acquisition"
         articles_filtered = filter_articles(df)
         logger.info(f"Articles after filtering: {len(articles_filtered)}")
 
-        top_articles = get_relevant_articles(articles_filtered, query, article_count)
-        logger.info(f"Selected top {article_count} articles")
+        # Collapse syndicated copies so each story is embedded and ranked once
+        articles_filtered, _ = collapse_near_duplicates(articles_filtered)
+        logger.info(f"Articles after de-duplication: {len(articles_filtered)}")
+
+        # Skip stories already sent so they cost no embedding or Gemini time
+        featured_index = None
+        if not allow_repeats:
+            featured_index = FeaturedIndex()
+            articles_filtered, _ = featured_index.drop_featured(
+                articles_filtered, before=to_date if replay else None
+            )
+
+        top_articles = get_relevant_articles(
+            articles_filtered,
+            topics,
+            article_count,
+            lexical_candidates=lexical_candidates,
+            rerank_candidates=rerank_candidates,
+        )
+        logger.info(
+            f"Selected {len(top_articles)} articles across {len(topics)} topics"
+        )
+
+        if full_text:
+            top_articles = extract_full_text(
+                top_articles, workers=extraction_workers, cache_only=replay
+            )
 
         # Summarize articles
-        logger.info(f"Summarizing top {article_count} articles...")
-        top_articles["summary"] = top_articles.apply(
-            lambda row: summarize_article_gemini(
-                source=row["source"],
-                title=row["title"],
-                url=row["url"],
-                published_at=row["published_at"],
-                description=row["description"],
-                content=row["content"],
-            ),
-            axis=1,
+        logger.info(f"Summarizing {len(top_articles)} articles...")
+        top_articles["summary"] = summarize_articles(
+            top_articles,
+            workers=summary_workers,
+            requests_per_minute=gemini_rpm,
+            timeout=summary_timeout,
+            batch_size=summary_batch_size,
+            cache_only=replay,
         )
 
+        if replay:
+            html_path = export_standalone_html(
+                top_articles, output_dir=REPLAY_OUTPUT_DIR, timestamp=timestamp
+            )
+            logger.info(f"Replay finished; exported HTML digest to {html_path}")
+            return
+
         # Save top articles
-        top_articles_path = (
-            output_dir_archives_top_articles / f"top_articles_{timestamp}.csv"
+        top_articles_path = write_articles(
+            top_articles, "top_articles", date.fromisoformat(timestamp)
         )
-        top_articles.to_csv(top_articles_path, index=True)
         logger.info(f"Saved top articles to {top_articles_path}")
 
         # Send email
         if RECIPIENT_EMAIL is None:
             raise RuntimeError("RECIPIENT_EMAIL is not set in .env file")
 
-        send_news_email(top_articles, RECIPIENT_EMAIL)
-        logger.info(f"Email sent successfully to {RECIPIENT_EMAIL}")
+        if send_news_email(top_articles, RECIPIENT_EMAIL):
+            logger.info(f"Email sent successfully to {RECIPIENT_EMAIL}")
+
+            if featured_index is not None:
+                added = featured_index.add(top_articles, date.fromisoformat(timestamp))
+                logger.info(f"Added {added} articles to the featured index")
+        else:
+            logger.error("Email was not sent; featured index left unchanged")
 
         # Export HTML
         html_path = export_standalone_html(top_articles, timestamp=timestamp)
         logger.info(f"Exported HTML digest to {html_path}")
 
+        # Index the new archive partitions for the search subcommand; the
+        # digest is already out, so a failure here must not fail the run
+        try:
+            SearchIndex().update()
+        except Exception as e:
+            logger.warning(f"Could not update the search index: {e}", exc_info=True)
+
     except Exception as e:
         logger.error(f"Error in main execution: {e}", exc_info=True)
         raise
 
 
+def search_archives(
+    query: str, limit: int = DEFAULT_SEARCH_LIMIT, featured_only: bool = False
+) -> None:
+    """Print the archived articles best matching a query.
+
+    New archive partitions are indexed first, so results include the
+    latest runs.
+
+    Args:
+        query: Free-text query
+        limit: Maximum number of hits to print
+        featured_only: Only show articles featured in a digest
+    """
+    index = SearchIndex()
+    index.update()
+
+    hits = index.search(query, limit=limit, featured_only=featured_only)
+    if hits.empty:
+        print(f"No archived articles match '{query}'")
+        return
+
+    for hit in hits.itertuples():
+        featured = f"  featured {hit.featured_on}" if hit.featured_on else ""
+        print(
+            f"{hit.score:6.2f}  {hit.first_archived}  {hit.source}{featured}\n"
+            f"        {hit.title}\n"
+            f"        {hit.url}"
+        )
+
+
+def compact_and_expire(
+    period: str = "week",
+    retention_days: int | None = DEFAULT_RETENTION_DAYS["all_articles"],
+    digest_retention_days: int | None = DEFAULT_RETENTION_DAYS["top_articles"],
+) -> None:
+    """Compact the article archives, apply retention and refresh derived data.
+
+    Args:
+        period: Compaction period, 'week' or 'month'
+        retention_days: Days of fetched-article archives to keep (None keeps all)
+        digest_retention_days: Days of top-article and HTML digest archives
+            to keep (None keeps all)
+    """
+    retention = {
+        "all_articles": retention_days,
+        "top_articles": digest_retention_days,
+    }
+    expired = dict.fromkeys(retention, 0)
+
+    for kind, days in retention.items():
+        if days is not None:
+            expired[kind] = apply_retention(kind, days)
+
+        merged = compact_archives(kind, period)
+        logger.info(f"Compacted {merged} {kind} partitions into {period}ly segments")
+
+    if digest_retention_days is not None:
+        cutoff = datetime.now(timezone.utc).date() - timedelta(
+            days=digest_retention_days
+        )
+        for path in HTML_ARCHIVE_DIR.glob("archie_digest_*.html"):
+            try:
+                digest_date = date.fromisoformat(path.stem.split("_")[-1])
+            except ValueError:
+                continue
+
+            if digest_date < cutoff:
+                path.unlink()
+                logger.info(f"Removed expired HTML digest {path}")
+
+    indexed = SearchIndex().rebuild()
+    logger.info(f"Rebuilt the search index ({indexed} articles)")
+
+    # The vector index embeds every new partition, which is too slow for the
+    # digest run; related also brings it up to date before each lookup. It
+    # runs before the embedding store is pruned so a rebuild finds every
+    # vector it indexed before
+    if VECTOR_INDEX_DIR.exists():
+        try:
+            if expired["all_articles"]:
+                indexed = VectorIndex().rebuild()
+                logger.info(f"Rebuilt the vector index ({indexed} articles)")
+            else:
+                VectorIndex().update()
+        except Exception as e:
+            logger.warning(f"Could not update the vector index: {e}", exc_info=True)
+
+    pruned = prune_response_cache()
+    logger.info(f"Pruned {pruned} expired API responses from the cache")
+
+    evicted = get_embedding_store().prune()
+    logger.info(f"Evicted {evicted} stale vectors from the embedding store")
+
+
+def related_articles(
+    text: str | None = None, url: str | None = None, limit: int = DEFAULT_TOP_K
+) -> None:
+    """Print the archived articles semantically closest to a text or article.
+
+    The vector index is built on first use and brought up to date with new
+    archive partitions before searching.
+
+    Args:
+        text: Free text to find related coverage for
+        url: URL of an archived article to find related coverage for
+        limit: Maximum number of hits to print
+
+    Raises:
+        ValueError: If neither text nor url is given, or url is not archived
+    """
+    index = VectorIndex()
+    index.update()
+
+    if url is not None:
+        vector = index.vector_for_url(url)
+        if vector is None:
+            raise ValueError(f"Article is not in the archives: {url}")
+    elif text:
+        vector = encode_query(text)
+    else:
+        raise ValueError("Give a text or --url to find related articles")
+
+    hits = index.search(vector, k=limit, exclude_urls=[url] if url else None)
+    for hit in hits.itertuples():
+        print(
+            f"{hit.score:6.3f}  {hit.archive_date}  {hit.source}\n"
+            f"        {hit.title}\n"
+            f"        {hit.url}"
+        )
+
+
+def compare_encoder_backends(
+    backends: List[str],
+    days: int = 30,
+    end_date: date | None = None,
+    top_n: int = 10,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> None:
+    """Print how closely other backends reproduce the reference ranking.
+
+    Ranks the filtered articles archived in the window with each backend
+    against the first digest topic.
+
+    Args:
+        backends: Backends to compare, reference first
+        days: Number of archived days to rank
+        end_date: Last archive date of the window (defaults to today, UTC)
+        top_n: Size of the top list whose overlap is reported
+        batch_size: Number of texts per forward pass
+    """
+    to_date = end_date or datetime.now(timezone.utc).date()
+    articles = load_articles("all_articles", to_date - timedelta(days=days), to_date)
+    articles = filter_articles(articles.drop_duplicates(subset="url"))
+    logger.info(f"Comparing {backends} on {len(articles)} archived articles")
+
+    query = next(iter(load_topics().values()))
+    report = compare_backends(articles, query, backends, top_n, batch_size)
+    print(report.to_string(float_format=lambda x: f"{x:.4f}"))
+
+
+def compare_prefilter_limits(
+    candidate_limits: List[int],
+    days: int = 30,
+    end_date: date | None = None,
+    top_n: int = 10,
+) -> None:
+    """Print how closely prefiltered rankings reproduce ranking every article.
+
+    Args:
+        candidate_limits: Articles kept per topic by the lexical prefilter
+        days: Number of archived days to rank
+        end_date: Last archive date of the window (defaults to today, UTC)
+        top_n: Number of top articles per topic
+    """
+    to_date = end_date or datetime.now(timezone.utc).date()
+    articles = load_articles("all_articles", to_date - timedelta(days=days), to_date)
+    articles = filter_articles(articles.drop_duplicates(subset="url"))
+    logger.info(f"Comparing prefilter limits on {len(articles)} archived articles")
+
+    report = compare_prefilter(articles, load_topics(), candidate_limits, top_n)
+    print(report.to_string(float_format=lambda x: f"{x:.4f}"))
+
+
 def parse_arguments() -> argparse.Namespace:
     """Parse command-line arguments.
 
@@ -171,9 +580,27 @@ def parse_arguments() -> argparse.Namespace:
 Examples:
   python main.py                                    # Use all defaults
   python main.py --days 14                         # Fetch articles from last 14 days
-  python main.py --count 15                        # Get top 15 articles
+  python main.py --count 15                        # Get top 15 articles per topic
+  python main.py --topics my_topics.json           # Rank against other topic sections
   python main.py --query-terms long                # Use comprehensive search terms
   python main.py --days 30 --count 20 --query-terms long  # Combine multiple flags
+  python main.py --no-cache                        # Ignore cached API responses
+  python main.py --incremental                     # Only fetch what is new since last run
+  python main.py --plan-queries                    # Pack terms into requests by past yield
+  python main.py --replay --end-date 2025-10-21    # Rerun the pipeline on archived articles
+  python main.py --allow-repeats                   # Keep articles featured in past digests
+  python main.py migrate-archives                  # Convert legacy CSV archives to Parquet
+  python main.py search "synthetic data vendor"    # Search the article archives
+  python main.py compact --retention-days 365      # Merge daily archives, keep one year
+  python main.py --encoder-backend onnx-int8       # Quantized ONNX embeddings
+  python main.py compare-backends onnx onnx-int8   # Check ranking agreement with torch
+  python main.py --days 30 --embedding-workers 4   # Encode embeddings on 4 cores
+  python main.py related "clean room data sharing" # Semantically related past coverage
+  python main.py --no-full-text                    # Summarize the API snippets only
+  python main.py --gemini-rpm 1000 --summary-workers 16  # Paid-tier Gemini quota
+  python main.py --count 20 --summary-batch-size 5  # Summarize 5 articles per request
+  python main.py --rerank 30                       # Rerank top candidates with a cross-encoder
+  python main.py compare-prefilter 100 300 --days 7  # Check prefilter limits against full ranking
         """,
     )
 
@@ -188,7 +615,7 @@ Examples:
         "--count",
         type=int,
         default=10,
-        help="Number of top articles to include in digest (default: 10)",
+        help="Number of top articles per topic section of the digest (default: 10)",
     )
 
     parser.add_argument(
@@ -199,6 +626,271 @@ Examples:
         help="Which query terms file to use: 'short' or 'long' (default: short)",
     )
 
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Always call NewsAPI and GDELT instead of reusing cached responses",
+    )
+
+    parser.add_argument(
+        "--cache-ttl-hours",
+        type=float,
+        default=24.0,
+        help="Maximum age in hours of a cached API response (default: 24)",
+    )
+
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Only fetch articles newer than the last run and merge with archives",
+    )
+
+    parser.add_argument(
+        "--plan-queries",
+        action="store_true",
+        help="Pack query terms into requests by their yield in past archives",
+    )
+
+    parser.add_argument(
+        "--end-date",
+        type=date.fromisoformat,
+        default=None,
+        help="Last day of the article window, YYYY-MM-DD (default: today)",
+    )
+
+    parser.add_argument(
+        "--replay",
+        action="store_true",
+        help="Replay archived articles instead of calling NewsAPI and GDELT; "
+        "nothing is archived or emailed",
+    )
+
+    parser.add_argument(
+        "--replay-latency",
+        type=float,
+        default=0.0,
+        help="Simulated seconds per request in replay mode (default: 0)",
+    )
+
+    parser.add_argument(
+        "--allow-repeats",
+        action="store_true",
+        help="Keep articles that were already featured in a previously sent digest",
+    )
+
+    parser.add_argument(
+        "--encoder-backend",
+        choices=list(ENCODER_BACKENDS),
+        default=DEFAULT_BACKEND,
+        help=f"Inference backend for article embeddings (default: {DEFAULT_BACKEND})",
+    )
+
+    parser.add_argument(
+        "--embedding-batch-size",
+        type=int,
+        default=DEFAULT_BATCH_SIZE,
+        help=f"Texts per embedding forward pass (default: {DEFAULT_BATCH_SIZE})",
+    )
+
+    parser.add_argument(
+        "--embedding-workers",
+        type=int,
+        default=DEFAULT_EMBEDDING_WORKERS,
+        help="Processes encoding article embeddings, each with its own model copy "
+        f"(default: {DEFAULT_EMBEDDING_WORKERS})",
+    )
+
+    parser.add_argument(
+        "--topics",
+        type=Path,
+        default=DEFAULT_TOPICS_PATH,
+        help="JSON file of named topic queries, one digest section each "
+        f"(default: {DEFAULT_TOPICS_PATH})",
+    )
+
+    parser.add_argument(
+        "--lexical-candidates",
+        type=int,
+        default=DEFAULT_LEXICAL_CANDIDATES,
+        help="Articles per topic kept by the BM25 prefilter before embedding, "
+        f"0 embeds every article (default: {DEFAULT_LEXICAL_CANDIDATES})",
+    )
+
+    parser.add_argument(
+        "--rerank",
+        type=int,
+        default=DEFAULT_RERANK_CANDIDATES,
+        help="Articles per topic reranked with a cross-encoder, 0 disables "
+        f"reranking (default: {DEFAULT_RERANK_CANDIDATES})",
+    )
+
+    parser.add_argument(
+        "--no-full-text",
+        action="store_true",
+        help="Summarize the truncated API content instead of downloading the "
+        "full text of the top articles",
+    )
+
+    parser.add_argument(
+        "--extraction-workers",
+        type=int,
+        default=DEFAULT_EXTRACTION_WORKERS,
+        help="Article pages downloaded concurrently for full-text extraction "
+        f"(default: {DEFAULT_EXTRACTION_WORKERS})",
+    )
+
+    parser.add_argument(
+        "--summary-workers",
+        type=int,
+        default=DEFAULT_SUMMARY_WORKERS,
+        help="Maximum number of concurrent Gemini calls "
+        f"(default: {DEFAULT_SUMMARY_WORKERS})",
+    )
+
+    parser.add_argument(
+        "--gemini-rpm",
+        type=float,
+        default=DEFAULT_REQUESTS_PER_MINUTE,
+        help="Gemini requests-per-minute quota to stay within "
+        f"(default: {DEFAULT_REQUESTS_PER_MINUTE})",
+    )
+
+    parser.add_argument(
+        "--summary-timeout",
+        type=float,
+        default=DEFAULT_SUMMARY_TIMEOUT,
+        help="Timeout of a single Gemini call in seconds "
+        f"(default: {DEFAULT_SUMMARY_TIMEOUT:g})",
+    )
+
+    parser.add_argument(
+        "--no-summary-cache",
+        action="store_true",
+        help="Always call Gemini instead of reusing cached article summaries",
+    )
+
+    parser.add_argument(
+        "--summary-batch-size",
+        type=int,
+        default=DEFAULT_SUMMARY_BATCH_SIZE,
+        help="Articles summarized per Gemini request with JSON output, 1 sends "
+        f"one request per article (default: {DEFAULT_SUMMARY_BATCH_SIZE})",
+    )
+
+    subparsers = parser.add_subparsers(dest="command", metavar="command")
+
+    migrate_parser = subparsers.add_parser(
+        "migrate-archives",
+        help="Convert the legacy per-day CSV archives to Parquet partitions",
+    )
+    migrate_parser.add_argument(
+        "--remove-csv",
+        action="store_true",
+        help="Delete each CSV archive once it has been migrated",
+    )
+
+    search_parser = subparsers.add_parser(
+        "search", help="Search the article archives with BM25 ranking"
+    )
+    search_parser.add_argument("query", help="Free-text search query")
+    search_parser.add_argument(
+        "--limit",
+        type=int,
+        default=DEFAULT_SEARCH_LIMIT,
+        help=f"Maximum number of hits (default: {DEFAULT_SEARCH_LIMIT})",
+    )
+    search_parser.add_argument(
+        "--featured-only",
+        action="store_true",
+        help="Only show articles that were featured in a digest",
+    )
+
+    compact_parser = subparsers.add_parser(
+        "compact",
+        help="Merge daily archives into segments and apply the retention policy",
+    )
+    compact_parser.add_argument(
+        "--period",
+        choices=COMPACTION_PERIODS,
+        default="week",
+        help="Length of a compacted segment (default: week)",
+    )
+    compact_parser.add_argument(
+        "--retention-days",
+        type=int,
+        default=DEFAULT_RETENTION_DAYS["all_articles"],
+        help="Days of fetched-article archives to keep (default: keep all)",
+    )
+    compact_parser.add_argument(
+        "--digest-retention-days",
+        type=int,
+        default=DEFAULT_RETENTION_DAYS["top_articles"],
+        help="Days of top-article and HTML digest archives to keep "
+        "(default: keep all)",
+    )
+
+    related_parser = subparsers.add_parser(
+        "related", help="Find semantically related articles in the archives"
+    )
+    related_parser.add_argument(
+        "text", nargs="?", help="Free text to find related coverage for"
+    )
+    related_parser.add_argument(
+        "--url", help="Find coverage related to this archived article instead"
+    )
+    related_parser.add_argument(
+        "--limit",
+        type=int,
+        default=DEFAULT_TOP_K,
+        help=f"Maximum number of hits (default: {DEFAULT_TOP_K})",
+    )
+
+    compare_parser = subparsers.add_parser(
+        "compare-backends",
+        help="Check the ranking agreement of encoder backends on archived articles",
+    )
+    compare_parser.add_argument(
+        "backends",
+        nargs="+",
+        choices=list(ENCODER_BACKENDS),
+        help=f"Backends to compare with the reference backend ({DEFAULT_BACKEND})",
+    )
+    compare_parser.add_argument(
+        "--days",
+        type=int,
+        default=30,
+        help="Number of archived days to rank (default: 30)",
+    )
+    compare_parser.add_argument(
+        "--top",
+        type=int,
+        default=10,
+        help="Size of the top list whose overlap is reported (default: 10)",
+    )
+
+    prefilter_parser = subparsers.add_parser(
+        "compare-prefilter",
+        help="Check how prefilter limits change the ranking of archived articles",
+    )
+    prefilter_parser.add_argument(
+        "limits",
+        nargs="+",
+        type=int,
+        help="Articles per topic kept by the lexical prefilter",
+    )
+    prefilter_parser.add_argument(
+        "--days",
+        type=int,
+        default=30,
+        help="Number of archived days to rank (default: 30)",
+    )
+    prefilter_parser.add_argument(
+        "--top",
+        type=int,
+        default=10,
+        help="Number of top articles per topic (default: 10)",
+    )
+
     return parser.parse_args()
 
 
@@ -208,11 +900,72 @@ if __name__ == "__main__":
 
     try:
         args = parse_arguments()
-        main(
-            days=args.days,
-            article_count=args.count,
-            query_terms_length=args.query_terms,
-        )
+
+        if args.command == "migrate-archives":
+            migrated = migrate_legacy_archives(remove_csv=args.remove_csv)
+            logger.info(f"Migrated {migrated} CSV archives to Parquet")
+        elif args.command == "compact":
+            configure_encoder(
+                args.encoder_backend,
+                args.embedding_batch_size,
+                args.embedding_workers,
+            )
+            compact_and_expire(
+                args.period, args.retention_days, args.digest_retention_days
+            )
+        elif args.command == "related":
+            configure_encoder(
+                args.encoder_backend,
+                args.embedding_batch_size,
+                args.embedding_workers,
+            )
+            related_articles(args.text, args.url, args.limit)
+        elif args.command == "compare-backends":
+            compare_encoder_backends(
+                [DEFAULT_BACKEND] + [b for b in args.backends if b != DEFAULT_BACKEND],
+                days=args.days,
+                end_date=args.end_date,
+                top_n=args.top,
+                batch_size=args.embedding_batch_size,
+            )
+        elif args.command == "compare-prefilter":
+            configure_encoder(
+                args.encoder_backend,
+                args.embedding_batch_size,
+                args.embedding_workers,
+            )
+            compare_prefilter_limits(
+                args.limits, days=args.days, end_date=args.end_date, top_n=args.top
+            )
+        elif args.command == "search":
+            search_archives(args.query, args.limit, args.featured_only)
+        else:
+            main(
+                days=args.days,
+                article_count=args.count,
+                query_terms_length=args.query_terms,
+                use_cache=not args.no_cache,
+                cache_ttl_hours=args.cache_ttl_hours,
+                incremental=args.incremental,
+                plan_query_chunks=args.plan_queries,
+                end_date=args.end_date,
+                replay=args.replay,
+                replay_latency=args.replay_latency,
+                allow_repeats=args.allow_repeats,
+                encoder_backend=args.encoder_backend,
+                embedding_batch_size=args.embedding_batch_size,
+                embedding_workers=args.embedding_workers,
+                topics_path=args.topics,
+                lexical_candidates=args.lexical_candidates,
+                rerank_candidates=args.rerank,
+                full_text=not args.no_full_text,
+                extraction_workers=args.extraction_workers,
+                summary_workers=args.summary_workers,
+                gemini_rpm=args.gemini_rpm,
+                summary_timeout=args.summary_timeout,
+                use_summary_cache=not args.no_summary_cache,
+                summary_batch_size=args.summary_batch_size,
+            )
 
         elapsed_time = time.time() - start_time
         logger.info(f"Archie completed successfully in {elapsed_time:.2f} seconds")
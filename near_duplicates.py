@@ -0,0 +1,174 @@
+"""Near-duplicate article detection using MinHash signatures and LSH."""
+
+import logging
+import zlib
+from typing import List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from helper_functions import tokenize
+
+logger = logging.getLogger(__name__)
+
+# Constants
+NUM_PERMUTATIONS = 128
+NUM_BANDS = 32
+SHINGLE_SIZE = 3
+SIMILARITY_THRESHOLD = 0.7
+RANDOM_SEED = 1
+# Largest prime below 2**32: a * h + b with a, b, h below it fits in uint64
+_HASH_PRIME = np.uint64(4294967291)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+
+
+def _shingles(text: str, size: int = SHINGLE_SIZE) -> np.ndarray:
+    """Hash the word shingles of a text to 32-bit integers.
+
+    Texts shorter than the shingle size fall back to single words.
+    """
+    tokens = tokenize(text)
+    width = min(size, len(tokens)) or 1
+    grams = {" ".join(tokens[i : i + width]) for i in range(len(tokens) - width + 1)}
+
+    return np.fromiter(
+        (zlib.crc32(gram.encode("utf-8")) for gram in grams),
+        dtype=np.uint64,
+        count=len(grams),
+    )
+
+
+def minhash_signatures(
+    texts: List[str], num_permutations: int = NUM_PERMUTATIONS
+) -> np.ndarray:
+    """Compute MinHash signatures of the shingle sets of many texts.
+
+    Args:
+        texts: Texts to sign
+        num_permutations: Number of hash permutations (signature length)
+
+    Returns:
+        Array of shape (len(texts), num_permutations); texts without any
+        shingles get an all-max signature, which no permutation produces
+    """
+    rng = np.random.RandomState(RANDOM_SEED)
+    a = rng.randint(1, _HASH_PRIME, size=num_permutations, dtype=np.uint64)
+    b = rng.randint(0, _HASH_PRIME, size=num_permutations, dtype=np.uint64)
+
+    signatures = np.full((len(texts), num_permutations), _MAX_HASH, dtype=np.uint64)
+
+    for i, text in enumerate(texts):
+        hashes = _shingles(text) % _HASH_PRIME
+        if hashes.size == 0:
+            continue
+
+        permuted = (hashes[:, None] * a + b) % _HASH_PRIME
+        signatures[i] = permuted.min(axis=0)
+
+    return signatures
+
+
+def find_near_duplicate_clusters(
+    texts: List[str],
+    threshold: float = SIMILARITY_THRESHOLD,
+    num_bands: int = NUM_BANDS,
+) -> np.ndarray:
+    """Group texts whose estimated Jaccard similarity reaches the threshold.
+
+    Signatures are split into bands; texts sharing any band land in the
+    same LSH bucket and every pair in a bucket is then compared, so the
+    cost grows with the number of candidates rather than with every pair
+    of texts. Pairs reaching the threshold are merged with union-find.
+
+    Args:
+        texts: Texts to cluster
+        threshold: Minimum estimated Jaccard similarity of duplicates
+        num_bands: Number of LSH bands (must divide the signature length)
+
+    Returns:
+        Cluster label per text; texts in the same cluster share a label
+    """
+    signatures = minhash_signatures(texts)
+    rows_per_band = signatures.shape[1] // num_bands
+    parent = np.arange(len(texts))
+
+    def find(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    signed = np.flatnonzero((signatures != _MAX_HASH).any(axis=1))
+
+    # Texts with identical signatures are merged outright, so only one of
+    # each is bucketed and syndicated copies do not swell the buckets
+    _, first, inverse = np.unique(
+        signatures[signed], axis=0, return_index=True, return_inverse=True
+    )
+    parent[signed] = signed[first][inverse.ravel()]
+    signed = np.sort(signed[first])
+
+    for band in range(num_bands):
+        band_slice = signatures[:, band * rows_per_band : (band + 1) * rows_per_band]
+        buckets = {}
+
+        for i in signed:
+            buckets.setdefault(band_slice[i].tobytes(), []).append(i)
+
+        for members in buckets.values():
+            if len(members) < 2:
+                continue
+
+            bucket = signatures[members]
+
+            for x in range(len(members) - 1):
+                similarity = (bucket[x + 1 :] == bucket[x]).mean(axis=1)
+
+                for y in np.flatnonzero(similarity >= threshold) + x + 1:
+                    root_x, root_y = find(members[x]), find(members[y])
+                    if root_x != root_y:
+                        parent[max(root_x, root_y)] = min(root_x, root_y)
+
+    return np.array([find(i) for i in range(len(texts))])
+
+
+def collapse_near_duplicates(df: pd.DataFrame) -> Tuple[pd.DataFrame, int]:
+    """Keep one representative article per near-duplicate cluster.
+
+    Articles are compared on title and description (GDELT descriptions only
+    hold the domain, so GDELT rows use the title alone). The representative
+    is the cluster member with the most description and content text.
+
+    Args:
+        df: DataFrame with 'title', 'description', 'content' and
+            'fetched_from' columns
+
+    Returns:
+        Tuple of the de-duplicated DataFrame (original order preserved)
+        and the number of articles collapsed
+    """
+    if df.empty:
+        return df, 0
+
+    description = df["description"].fillna("").where(df["fetched_from"] != "gdelt", "")
+    texts = (df["title"].fillna("") + " " + description).tolist()
+
+    labels = find_near_duplicate_clusters(texts)
+    richness = (
+        df["description"].fillna("").str.len() + df["content"].fillna("").str.len()
+    ).to_numpy()
+
+    clusters = pd.DataFrame(
+        {"label": labels, "richness": richness, "position": np.arange(len(df))}
+    )
+    keep = (
+        clusters.sort_values(["richness", "position"], ascending=[False, True])
+        .drop_duplicates(subset="label")
+        .sort_values("position")["position"]
+        .to_numpy()
+    )
+
+    collapsed = len(df) - len(keep)
+    logger.info(f"Collapsed {collapsed} near-duplicate articles into their clusters")
+
+    return df.iloc[keep].reset_index(drop=True), collapsed
@@ -0,0 +1,145 @@
+"""Ranking agreement checks for encoder backends and candidate prefiltering."""
+
+import logging
+import time
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+from sklearn.metrics.pairwise import cosine_similarity
+
+from lexical_prefilter import select_candidates
+from semantic_similarity import (
+    DEFAULT_BATCH_SIZE,
+    build_combined_text,
+    encode_texts,
+    get_relevant_articles,
+    load_encoder,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def compare_backends(
+    df: pd.DataFrame,
+    query: str,
+    backends: List[str],
+    top_n: int = 10,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> pd.DataFrame:
+    """Rank the same articles with several backends and compare the rankings.
+
+    The first backend is the reference. Every backend encodes all articles
+    from scratch (the embedding store is bypassed) so encode times are
+    comparable.
+
+    Args:
+        df: Articles with 'title' and 'description' columns
+        query: Query to rank against
+        backends: Backend names from ENCODER_BACKENDS, reference first
+        top_n: Size of the top list whose overlap is reported
+        batch_size: Number of texts per forward pass
+
+    Returns:
+        DataFrame indexed by backend with 'encode_seconds',
+        'texts_per_second', 'top_n_overlap' (share of the reference top N
+        also in the backend's top N), 'spearman' (rank correlation of all
+        scores with the reference) and 'max_score_diff' columns
+
+    Raises:
+        ValueError: If there are no articles to rank
+    """
+    if df.empty:
+        raise ValueError("No articles to rank")
+
+    texts = build_combined_text(df).tolist()
+    scores = {}
+    rows = []
+
+    for backend in backends:
+        model = load_encoder(backend)
+
+        start = time.perf_counter()
+        embeddings = encode_texts(model, texts, batch_size)
+        elapsed = time.perf_counter() - start
+
+        query_embedding = np.asarray(model.encode(query)).reshape(1, -1)
+        scores[backend] = pd.Series(
+            cosine_similarity(query_embedding, embeddings).flatten()
+        )
+        logger.info(f"Encoded {len(texts)} articles with {backend} in {elapsed:.2f}s")
+
+        rows.append(
+            {
+                "backend": backend,
+                "encode_seconds": elapsed,
+                "texts_per_second": len(texts) / elapsed if elapsed else np.inf,
+            }
+        )
+
+    reference = scores[backends[0]]
+    reference_top = set(reference.nlargest(top_n).index)
+
+    for row in rows:
+        backend_scores = scores[row["backend"]]
+        backend_top = set(backend_scores.nlargest(top_n).index)
+
+        row["top_n_overlap"] = len(reference_top & backend_top) / len(reference_top)
+        row["spearman"] = backend_scores.corr(reference, method="spearman")
+        row["max_score_diff"] = (backend_scores - reference).abs().max()
+
+    return pd.DataFrame(rows).set_index("backend")
+
+
+def compare_prefilter(
+    df: pd.DataFrame,
+    topics: Dict[str, str],
+    candidate_limits: List[int],
+    top_n: int = 10,
+) -> pd.DataFrame:
+    """Compare prefiltered rankings with ranking every article.
+
+    The reference embeds every article. For each limit, only the best
+    lexical matches of each topic are embedded and ranked.
+
+    Args:
+        df: Articles with 'title', 'description' and 'url' columns
+        topics: Mapping of topic name to topic query
+        candidate_limits: Articles kept per topic by the lexical prefilter
+        top_n: Number of top articles per topic
+
+    Returns:
+        DataFrame indexed by candidate limit with 'embedded' (articles
+        encoded), 'top_n_overlap' (share of the reference top articles also
+        selected) and 'mean_relevance' (mean similarity of the selected
+        articles to their topic) columns; the reference row has limit 0
+
+    Raises:
+        ValueError: If there are no articles to rank
+    """
+    if df.empty:
+        raise ValueError("No articles to rank")
+
+    texts = (df["title"].fillna("") + " " + df["description"].fillna("")).tolist()
+    reference = get_relevant_articles(df, topics, top_n, lexical_candidates=None)
+    reference_keys = set(zip(reference["topic"], reference["url"]))
+    rows = []
+
+    for limit in [0] + candidate_limits:
+        if limit:
+            ranked = get_relevant_articles(df, topics, top_n, lexical_candidates=limit)
+            embedded = len(select_candidates(texts, list(topics.values()), limit))
+        else:
+            ranked, embedded = reference, len(df)
+
+        keys = set(zip(ranked["topic"], ranked["url"]))
+        rows.append(
+            {
+                "lexical_candidates": limit,
+                "embedded": embedded,
+                "top_n_overlap": len(keys & reference_keys) / len(reference_keys),
+                "mean_relevance": ranked["relevance_score"].mean(),
+            }
+        )
+
+    return pd.DataFrame(rows).set_index("lexical_candidates")
@@ -0,0 +1,263 @@
+"""Incrementally maintained full-text index over the article archives.
+
+Archived articles are tokenized once into an inverted index stored in
+SQLite. Each run only indexes archive partitions that were added or
+rewritten since the last update, and queries are ranked with BM25 over
+title, description and content.
+"""
+
+import logging
+import math
+import sqlite3
+from collections import Counter
+from datetime import date
+from pathlib import Path
+
+import pandas as pd
+
+from archive_store import ARCHIVE_DIRS, list_partitions, read_partition
+from disk_cache import DEFAULT_CACHE_DIR
+from helper_functions import canonicalize_url, tokenize
+
+logger = logging.getLogger(__name__)
+
+# Constants
+SEARCH_INDEX_PATH = DEFAULT_CACHE_DIR / "search_index.sqlite"
+INDEXED_COLUMNS = [
+    "source",
+    "title",
+    "url",
+    "published_at",
+    "description",
+    "content",
+    "fetched_from",
+]
+BM25_K1 = 1.5
+BM25_B = 0.75
+DEFAULT_SEARCH_LIMIT = 10
+
+
+class SearchIndex:
+    """BM25 inverted index over every article in the archives.
+
+    Articles are identified by canonical URL; an article archived in
+    several runs is indexed once under the first run that archived it and
+    flagged with the first digest that featured it.
+    """
+
+    def __init__(self, path: Path = SEARCH_INDEX_PATH) -> None:
+        """Open (or create) the search index.
+
+        Args:
+            path: SQLite database file
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        self._conn = sqlite3.connect(self.path)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS documents (
+                doc_id INTEGER PRIMARY KEY,
+                url_key TEXT NOT NULL UNIQUE,
+                url TEXT NOT NULL,
+                title TEXT NOT NULL,
+                source TEXT NOT NULL,
+                fetched_from TEXT NOT NULL,
+                published_at TEXT NOT NULL,
+                first_archived TEXT NOT NULL,
+                featured_on TEXT,
+                length INTEGER NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS postings (
+                term TEXT NOT NULL,
+                doc_id INTEGER NOT NULL,
+                tf INTEGER NOT NULL,
+                PRIMARY KEY (term, doc_id)
+            ) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS indexed_partitions (
+                path TEXT PRIMARY KEY,
+                mtime REAL NOT NULL
+            );
+            """
+        )
+        self._conn.commit()
+
+    def update(self) -> int:
+        """Index archive partitions that are new or changed since the last update.
+
+        Returns:
+            Number of articles added to the index
+        """
+        indexed = dict(self._conn.execute("SELECT path, mtime FROM indexed_partitions"))
+        added = 0
+
+        for kind in ARCHIVE_DIRS:
+            for _, _, path in list_partitions(kind):
+                mtime = path.stat().st_mtime
+                if indexed.get(str(path)) == mtime:
+                    continue
+
+                batch = read_partition(kind, path, columns=INDEXED_COLUMNS)
+                if not batch.empty:
+                    added += self._index_batch(batch, kind)
+
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO indexed_partitions VALUES (?, ?)",
+                    (str(path), mtime),
+                )
+                self._conn.commit()
+
+        if added:
+            logger.info(f"Indexed {added} new archived articles for search")
+
+        return added
+
+    def _index_batch(self, batch: pd.DataFrame, kind: str) -> int:
+        """Add unseen articles of a partition or segment and flag featured ones."""
+        archive_dates = batch["archive_date"].map(date.isoformat)
+        published_at = batch["published_at"].dt.strftime("%Y-%m-%d").fillna("")
+        texts = (
+            batch["title"].fillna("")
+            + " "
+            + batch["description"].fillna("")
+            + " "
+            + batch["content"].fillna("")
+        )
+        added = 0
+
+        for url, title, source, fetched_from, published, archive_date, text in zip(
+            batch["url"],
+            batch["title"],
+            batch["source"].astype(str),
+            batch["fetched_from"].astype(str),
+            published_at,
+            archive_dates,
+            texts,
+        ):
+            url_key = canonicalize_url(url)
+            term_counts = Counter(tokenize(text))
+
+            cursor = self._conn.execute(
+                "INSERT OR IGNORE INTO documents "
+                "(url_key, url, title, source, fetched_from, published_at, "
+                "first_archived, length) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    url_key,
+                    url,
+                    title,
+                    source,
+                    fetched_from,
+                    published,
+                    archive_date,
+                    sum(term_counts.values()),
+                ),
+            )
+
+            if cursor.rowcount:
+                self._conn.executemany(
+                    "INSERT INTO postings VALUES (?, ?, ?)",
+                    (
+                        (term, cursor.lastrowid, count)
+                        for term, count in term_counts.items()
+                    ),
+                )
+                added += 1
+
+            if kind == "top_articles":
+                self._conn.execute(
+                    "UPDATE documents SET featured_on = ? WHERE url_key = ? "
+                    "AND (featured_on IS NULL OR featured_on > ?)",
+                    (archive_date, url_key, archive_date),
+                )
+
+        return added
+
+    def rebuild(self) -> int:
+        """Drop the whole index and re-index every archive partition.
+
+        Returns:
+            Number of articles indexed
+        """
+        self._conn.executescript(
+            "DELETE FROM postings; DELETE FROM documents; DELETE FROM indexed_partitions;"
+        )
+        self._conn.commit()
+
+        return self.update()
+
+    def search(
+        self,
+        query: str,
+        limit: int = DEFAULT_SEARCH_LIMIT,
+        featured_only: bool = False,
+    ) -> pd.DataFrame:
+        """Rank archived articles against a query with BM25.
+
+        Args:
+            query: Free-text query
+            limit: Maximum number of hits
+            featured_only: Only return articles featured in a digest
+
+        Returns:
+            DataFrame of hits, best first, with 'score', 'first_archived',
+            'featured_on', 'published_at', 'source', 'title' and 'url' columns
+        """
+        columns = [
+            "score",
+            "first_archived",
+            "featured_on",
+            "published_at",
+            "source",
+            "title",
+            "url",
+        ]
+        num_docs, avg_length = self._conn.execute(
+            "SELECT COUNT(*), AVG(length) FROM documents"
+        ).fetchone()
+
+        if not num_docs:
+            return pd.DataFrame(columns=columns)
+
+        featured_clause = "AND d.featured_on IS NOT NULL" if featured_only else ""
+        scores: Counter = Counter()
+
+        for term in set(tokenize(query)):
+            postings = self._conn.execute(
+                "SELECT p.doc_id, p.tf, d.length FROM postings p "
+                "JOIN documents d ON d.doc_id = p.doc_id "
+                f"WHERE p.term = ? {featured_clause}",
+                (term,),
+            ).fetchall()
+
+            doc_freq = self._conn.execute(
+                "SELECT COUNT(*) FROM postings WHERE term = ?", (term,)
+            ).fetchone()[0]
+            idf = math.log(1 + (num_docs - doc_freq + 0.5) / (doc_freq + 0.5))
+
+            for doc_id, tf, length in postings:
+                norm = BM25_K1 * (1 - BM25_B + BM25_B * length / avg_length)
+                scores[doc_id] += idf * tf * (BM25_K1 + 1) / (tf + norm)
+
+        top = scores.most_common(limit)
+        if not top:
+            return pd.DataFrame(columns=columns)
+
+        placeholders = ", ".join("?" * len(top))
+        rows = self._conn.execute(
+            "SELECT doc_id, first_archived, featured_on, published_at, source, "
+            f"title, url FROM documents WHERE doc_id IN ({placeholders})",
+            [doc_id for doc_id, _ in top],
+        ).fetchall()
+
+        hits = pd.DataFrame(rows, columns=["doc_id"] + columns[1:]).set_index("doc_id")
+        hits.insert(0, "score", pd.Series(dict(top)))
+
+        return hits.sort_values("score", ascending=False).reset_index(drop=True)
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def __len__(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM documents").fetchone()[0]
@@ -1,13 +1,21 @@
 """Semantic similarity functions for article ranking and filtering."""
 
 import logging
+import multiprocessing
 import os
-from typing import List
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from multiprocessing import shared_memory
+from typing import Any, Dict, List, Tuple
 
 import numpy as np
 import pandas as pd
-from sentence_transformers import SentenceTransformer
-from sklearn.metrics.pairwise import cosine_similarity
+from sentence_transformers import CrossEncoder, SentenceTransformer
+
+from embedding_store import EmbeddingStore, embedding_key
+from lexical_prefilter import DEFAULT_LEXICAL_CANDIDATES, prefilter_articles
 
 # Prevent tokenizer parallelism warnings
 os.environ["TOKENIZERS_PARALLELISM"] = "false"
@@ -16,58 +24,426 @@ logger = logging.getLogger(__name__)
 
 # Constants
 MODEL_NAME = "all-MiniLM-L6-v2"
+CROSS_ENCODER_NAME = "cross-encoder/ms-marco-MiniLM-L-6-v2"
 FILTERED_SOURCES = ["Pypi.org", "Fox News", "W3.org"]
+QUERY_CACHE_SIZE = 128
+DEFAULT_BACKEND = "torch"
+DEFAULT_BATCH_SIZE = 64
+DEFAULT_EMBEDDING_WORKERS = 1
+MIN_TEXTS_PER_WORKER = 256
+DEFAULT_RERANK_CANDIDATES = 0
+ENCODER_BACKENDS: Dict[str, Dict[str, Any]] = {
+    "torch": {"backend": "torch"},
+    "onnx": {"backend": "onnx"},
+    "onnx-int8": {
+        "backend": "onnx",
+        "model_kwargs": {"file_name": "onnx/model_quint8_avx2.onnx"},
+    },
+}
+
+# Process-wide model and embedding store, opened on first use
+_model: SentenceTransformer | None = None
+_cross_encoder: CrossEncoder | None = None
+_model_lock = threading.Lock()
+_embedding_store: EmbeddingStore | None = None
+_backend = DEFAULT_BACKEND
+_batch_size = DEFAULT_BATCH_SIZE
+_workers = DEFAULT_EMBEDDING_WORKERS
+
+# Model of an encoding worker process
+_worker_model: SentenceTransformer | None = None
+
+
+def configure_encoder(
+    backend: str = DEFAULT_BACKEND,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    workers: int = DEFAULT_EMBEDDING_WORKERS,
+) -> None:
+    """Select the inference backend, batch size and worker count for embeddings.
+
+    Changing the backend drops the loaded model and the cached query
+    embeddings; embeddings in the store are keyed by backend as well.
+
+    Args:
+        backend: One of ENCODER_BACKENDS ('torch', 'onnx' or 'onnx-int8')
+        batch_size: Number of texts encoded per forward pass
+        workers: Number of encoding processes for large batches (1 encodes
+            in this process)
+
+    Raises:
+        ValueError: If the backend is unknown
+    """
+    global _model, _backend, _batch_size, _workers
+
+    if backend not in ENCODER_BACKENDS:
+        raise ValueError(
+            f"Unknown encoder backend: {backend}. Use one of {list(ENCODER_BACKENDS)}"
+        )
+
+    with _model_lock:
+        if backend != _backend:
+            _model = None
+            encode_query.cache_clear()
+
+        _backend = backend
+        _batch_size = batch_size
+        _workers = max(1, workers)
+
+
+def model_id() -> str:
+    """Identify the configured model and backend, e.g. for cache keys."""
+    return f"{MODEL_NAME}:{_backend}"
+
+
+def load_encoder(backend: str = DEFAULT_BACKEND) -> SentenceTransformer:
+    """Load MODEL_NAME with an inference backend.
+
+    Args:
+        backend: One of ENCODER_BACKENDS
+
+    Returns:
+        Loaded SentenceTransformer
+
+    Raises:
+        RuntimeError: If the ONNX Runtime dependencies are not installed
+    """
+    logger.info(f"Loading sentence transformer model: {MODEL_NAME} ({backend})")
+    start = time.perf_counter()
+
+    try:
+        model = SentenceTransformer(MODEL_NAME, **ENCODER_BACKENDS[backend])
+    except ImportError as e:
+        raise RuntimeError(
+            f"The {backend} backend needs ONNX Runtime: "
+            "pip install 'sentence-transformers[onnx]'"
+        ) from e
+
+    logger.info(f"Loaded {MODEL_NAME} in {time.perf_counter() - start:.2f}s")
+    return model
+
+
+def get_model() -> SentenceTransformer:
+    """Return the shared sentence transformer, loading it on first use.
+
+    The model is loaded at most once per process, even when several threads
+    ask for it at the same time.
+
+    Returns:
+        Loaded SentenceTransformer for the configured backend
+    """
+    global _model
+
+    if _model is None:
+        with _model_lock:
+            if _model is None:
+                _model = load_encoder(_backend)
+
+    return _model
+
+
+def get_cross_encoder() -> CrossEncoder:
+    """Return the shared cross-encoder used for reranking, loading it on first use.
+
+    Returns:
+        Loaded CrossEncoder
+    """
+    global _cross_encoder
+
+    if _cross_encoder is None:
+        with _model_lock:
+            if _cross_encoder is None:
+                logger.info(f"Loading cross-encoder model: {CROSS_ENCODER_NAME}")
+                _cross_encoder = CrossEncoder(CROSS_ENCODER_NAME)
+
+    return _cross_encoder
+
+
+def encode_texts(
+    model: SentenceTransformer,
+    texts: List[str],
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> np.ndarray:
+    """Encode texts in batches of similar length.
+
+    SentenceTransformer.encode sorts its inputs by length before batching,
+    so each batch holds texts of similar length and padding stays small.
+
+    Args:
+        model: Loaded SentenceTransformer
+        texts: Texts to encode
+        batch_size: Number of texts per forward pass
+
+    Returns:
+        float32 array of shape (len(texts), embedding dimension)
+    """
+    return np.asarray(
+        model.encode(texts, batch_size=batch_size, show_progress_bar=False),
+        dtype=np.float32,
+    )
+
+
+def _init_encoding_worker(backend: str, threads: int) -> None:
+    """Load the model once per worker process and limit its CPU threads."""
+    global _worker_model
+
+    import torch
+
+    torch.set_num_threads(threads)
+    _worker_model = load_encoder(backend)
+
+
+def _encode_shard(
+    shm_name: str,
+    shape: Tuple[int, int],
+    rows: List[int],
+    texts: List[str],
+    batch_size: int,
+) -> int:
+    """Encode a shard in a worker and write it into the shared result matrix."""
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        result = np.ndarray(shape, dtype=np.float32, buffer=shm.buf)
+        result[rows] = encode_texts(_worker_model, texts, batch_size)
+    finally:
+        shm.close()
+
+    return len(rows)
+
+
+def encode_texts_parallel(
+    texts: List[str],
+    workers: int,
+    backend: str = DEFAULT_BACKEND,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> np.ndarray:
+    """Encode texts with a pool of worker processes, one model copy each.
+
+    Texts are sorted by length and dealt round-robin to the workers so that
+    every shard has a similar mix of lengths. Workers write their vectors
+    straight into a shared-memory matrix, so only the texts are pickled.
+
+    Args:
+        texts: Texts to encode
+        workers: Number of worker processes
+        backend: One of ENCODER_BACKENDS
+        batch_size: Number of texts per forward pass
+
+    Returns:
+        float32 array of shape (len(texts), embedding dimension)
+    """
+    shape = (len(texts), get_model().get_sentence_embedding_dimension())
+    shm = shared_memory.SharedMemory(create=True, size=max(1, shape[0] * shape[1] * 4))
+
+    order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+    shards = [order[w::workers] for w in range(workers)]
+    threads = max(1, (os.cpu_count() or 1) // workers)
+
+    try:
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_encoding_worker,
+            initargs=(backend, threads),
+        ) as pool:
+            futures = [
+                pool.submit(
+                    _encode_shard,
+                    shm.name,
+                    shape,
+                    shard,
+                    [texts[i] for i in shard],
+                    batch_size,
+                )
+                for shard in shards
+                if shard
+            ]
+            for future in futures:
+                future.result()
+
+        return np.ndarray(shape, dtype=np.float32, buffer=shm.buf).copy()
+
+    finally:
+        shm.close()
+        shm.unlink()
+
+
+def build_combined_text(df: pd.DataFrame) -> pd.Series:
+    """Combine title and description into the text that is embedded."""
+    return df["title"].fillna("") + ". " + df["description"].fillna("") + ". "
+
+
+@lru_cache(maxsize=QUERY_CACHE_SIZE)
+def encode_query(query: str) -> np.ndarray:
+    """Embed a query, reusing the embedding of recently seen queries.
+
+    Args:
+        query: Query text
+
+    Returns:
+        Query embedding (shared between callers; do not modify)
+    """
+    return np.asarray(get_model().encode(query))
+
+
+def get_embedding_store() -> EmbeddingStore:
+    """Return the shared on-disk embedding store, opening it on first use."""
+    global _embedding_store
+
+    with _model_lock:
+        if _embedding_store is None:
+            _embedding_store = EmbeddingStore()
+
+    return _embedding_store
+
+
+def embed_texts(texts: List[str]) -> np.ndarray:
+    """Embed texts, encoding only those not already in the embedding store.
+
+    Args:
+        texts: Texts to embed
+
+    Returns:
+        Array of shape (len(texts), embedding dimension)
+    """
+    store = get_embedding_store()
+    keys = [embedding_key(model_id(), text) for text in texts]
+    cached = store.get_many(keys)
+
+    missing = {key: text for key, text in zip(keys, texts) if key not in cached}
+    logger.info(f"Embedding store: {len(cached)} cached, {len(missing)} to encode")
+
+    if missing:
+        workers = min(_workers, len(missing) // MIN_TEXTS_PER_WORKER)
+        start = time.perf_counter()
+
+        if workers > 1:
+            encoded = encode_texts_parallel(
+                list(missing.values()), workers, _backend, _batch_size
+            )
+        else:
+            encoded = encode_texts(get_model(), list(missing.values()), _batch_size)
+
+        logger.info(
+            f"Encoded {len(missing)} texts in {time.perf_counter() - start:.2f}s "
+            f"({max(workers, 1)} process(es))"
+        )
+
+        store.add_many(list(missing), encoded)
+        cached.update(zip(missing, encoded))
+
+    return np.stack([cached[key] for key in keys])
+
+
+def warm_up_model(queries: List[str] | None = None) -> None:
+    """Load the model and pre-compute query embeddings ahead of ranking.
+
+    Meant to run in a background thread while articles are being fetched.
+
+    Args:
+        queries: Queries whose embeddings should be cached
+    """
+    get_model()
+
+    for query in queries or []:
+        encode_query(query)
+
+
+def _unit_rows(matrix: np.ndarray) -> np.ndarray:
+    """Scale each row to unit length so dot products are cosine similarities."""
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.maximum(norms, 1e-12)
 
 
 def get_relevant_articles(
-    df: pd.DataFrame, query: str, top_n: int = 10
+    df: pd.DataFrame,
+    query: str | Dict[str, str],
+    top_n: int = 10,
+    lexical_candidates: int | None = DEFAULT_LEXICAL_CANDIDATES,
+    rerank_candidates: int = DEFAULT_RERANK_CANDIDATES,
 ) -> pd.DataFrame:
-    """Find and rank articles most relevant to a query using semantic similarity.
+    """Find and rank articles most relevant to one or more topic queries.
 
-    Uses sentence transformers to generate embeddings and cosine similarity
-    to rank articles by relevance to the query.
+    Ranking runs in up to three stages. A BM25 prefilter keeps the best
+    lexical matches of each topic, so only those are embedded. The
+    candidates are then scored against every topic query in a single
+    normalized matrix product; each article belongs to the topic it scores
+    highest on, and the best of each topic are selected with argpartition
+    rather than by sorting every article. Optionally, the leading
+    candidates of each topic are reordered with a cross-encoder.
 
     Args:
         df: DataFrame containing articles with 'title' and 'description' columns
-        query: Search query to match against
-        top_n: Number of top articles to return
+        query: Search query, or mapping of topic name to topic query
+        top_n: Number of top articles to return per topic
+        lexical_candidates: Articles kept per topic by the lexical
+            prefilter (None or 0 embeds every article)
+        rerank_candidates: Articles per topic rescored with the
+            cross-encoder (0 disables reranking)
 
     Returns:
-        DataFrame with top N articles sorted by relevance score
+        DataFrame with the top N articles of each topic, grouped by topic in
+        the given order and sorted by relevance score (or by 'rerank_score'
+        when reranking); a 'topic' column is added when topics are given
     """
     if df.empty:
         logger.warning("Empty DataFrame provided to get_relevant_articles")
         return df
 
+    topics = query if isinstance(query, dict) else {None: query}
+
+    if lexical_candidates:
+        df = prefilter_articles(df, list(topics.values()), lexical_candidates)
+
     # Combine title and description for better matching
     df = df.copy()
-    df["combined_text"] = (
-        df["title"].fillna("") + ". " + df["description"].fillna("") + ". "
-    )
-
-    logger.info(f"Loading sentence transformer model: {MODEL_NAME}")
-    model = SentenceTransformer(MODEL_NAME)
+    df["combined_text"] = build_combined_text(df)
 
     logger.info("Generating article embeddings...")
-    article_embeddings = model.encode(
-        df["combined_text"].tolist(), show_progress_bar=True
+    article_embeddings_np = _unit_rows(embed_texts(df["combined_text"].tolist()))
+    query_embeddings_np = _unit_rows(
+        np.stack([encode_query(topic_query) for topic_query in topics.values()])
     )
 
-    query_embedding = model.encode(query)
+    similarity_scores = article_embeddings_np @ query_embeddings_np.T
+    best_topic = similarity_scores.argmax(axis=1)
+    pool_size = max(top_n, rerank_candidates)
 
-    # Convert tensors to numpy arrays for sklearn compatibility
-    query_embedding_np = np.array(query_embedding)
-    article_embeddings_np = np.array(article_embeddings)
+    sections = []
+    for i, (topic, topic_query) in enumerate(topics.items()):
+        candidates = np.flatnonzero(best_topic == i)
+        scores = similarity_scores[candidates, i]
 
-    similarity_scores = cosine_similarity(
-        query_embedding_np.reshape(1, -1), article_embeddings_np
-    ).flatten()
+        if len(candidates) > pool_size:
+            top = np.argpartition(-scores, pool_size - 1)[:pool_size]
+            candidates, scores = candidates[top], scores[top]
 
-    df["relevance_score"] = similarity_scores
+        order = np.argsort(-scores, kind="stable")
+        section = df.iloc[candidates[order]].assign(relevance_score=scores[order])
 
-    relevant_articles = df.sort_values(by="relevance_score", ascending=False)
+        if rerank_candidates and not section.empty:
+            section = _rerank(section, topic_query).head(top_n)
+        else:
+            section = section.head(top_n)
 
-    return relevant_articles.head(top_n)
+        if topic is not None:
+            section["topic"] = topic
+
+        sections.append(section)
+
+    return pd.concat(sections)
+
+
+def _rerank(section: pd.DataFrame, topic_query: str) -> pd.DataFrame:
+    """Reorder a topic's candidates by cross-encoder score."""
+    pairs = [(topic_query, text) for text in section["combined_text"]]
+    rerank_scores = np.asarray(
+        get_cross_encoder().predict(pairs, batch_size=_batch_size)
+    )
+
+    logger.info(f"Reranked {len(pairs)} candidates with {CROSS_ENCODER_NAME}")
+    return section.assign(rerank_score=rerank_scores).sort_values(
+        "rerank_score", ascending=False, kind="stable"
+    )
 
 
 def filter_articles(
@@ -1,25 +1,185 @@
 """Article summarization using Google Gemini AI."""
 
+import json
 import logging
 import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
 
+import pandas as pd
 from dotenv import load_dotenv
 from google import genai
+from google.genai import errors, types
+
+from disk_cache import DEFAULT_CACHE_DIR, DiskCache, cache_key
+from helper_functions import TokenBucket, backoff_delay, chunk_list
 
 logger = logging.getLogger(__name__)
 
 load_dotenv()
-
-# Initialize Gemini client
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
-if not GEMINI_API_KEY:
-    raise RuntimeError("GEMINI_API_KEY is not set in .env file")
-
-client = genai.Client(api_key=GEMINI_API_KEY)
 
 # Constants
 GEMINI_MODEL = "gemini-2.0-flash"
+# Bump when the prompt changes so summaries of the old prompt are not reused
+PROMPT_VERSION = 1
 DEFAULT_SUMMARY = "Summary not available."
+DEFAULT_SUMMARY_WORKERS = 8
+DEFAULT_REQUESTS_PER_MINUTE = 15
+DEFAULT_SUMMARY_TIMEOUT = 60.0
+SUMMARY_MAX_RETRIES = 3
+BACKOFF_BASE_SECONDS = 2.0
+BACKOFF_CAP_SECONDS = 30.0
+SUMMARY_CACHE_PATH = DEFAULT_CACHE_DIR / "summaries.sqlite"
+DEFAULT_SUMMARY_CACHE_MAX_MB = 50
+DEFAULT_SUMMARY_BATCH_SIZE = 1
+SUMMARY_INSTRUCTIONS = """\
+Please summarize the following article concisely but thoroughly, with a focus on \
+the takeaways relevant to a data startup. Focus on three main points, preferably \
+with a detailed sentence for each. Sentences should be no longer than 20 words but \
+no shorter than 10. Try to include key metrics such as percentages, statistics, or \
+any numerical data of importance. Do not provide any additional commentary or \
+trailing newline characters."""
+BATCH_RESPONSE_SCHEMA = types.Schema(
+    type=types.Type.ARRAY,
+    items=types.Schema(
+        type=types.Type.OBJECT,
+        properties={
+            "id": types.Schema(type=types.Type.STRING),
+            "summary": types.Schema(type=types.Type.STRING),
+        },
+        required=["id", "summary"],
+    ),
+)
+
+# Gemini client, created on first use so offline runs do not need a key
+_client: genai.Client | None = None
+
+_summary_cache: DiskCache | None = None
+_summary_cache_enabled = True
+
+
+def get_client() -> genai.Client:
+    """Return the Gemini client, creating it on first use.
+
+    Returns:
+        Gemini client
+
+    Raises:
+        RuntimeError: If GEMINI_API_KEY is not set
+    """
+    global _client
+
+    if _client is None:
+        if not GEMINI_API_KEY:
+            raise RuntimeError("GEMINI_API_KEY is not set in .env file")
+
+        _client = genai.Client(api_key=GEMINI_API_KEY)
+
+    return _client
+
+
+def configure_summary_cache(
+    enabled: bool = True, max_mb: int = DEFAULT_SUMMARY_CACHE_MAX_MB
+) -> None:
+    """Configure the on-disk cache of article summaries.
+
+    Args:
+        enabled: Whether summaries are read from and written to the cache
+        max_mb: Size limit of the cache file contents in megabytes
+    """
+    global _summary_cache, _summary_cache_enabled
+
+    _summary_cache_enabled = enabled
+    _summary_cache = (
+        DiskCache(SUMMARY_CACHE_PATH, max_bytes=max_mb * 1024 * 1024)
+        if enabled
+        else None
+    )
+
+
+def _get_summary_cache() -> DiskCache | None:
+    """Return the summary cache, opening it with defaults on first use."""
+    if _summary_cache is None and _summary_cache_enabled:
+        configure_summary_cache()
+
+    return _summary_cache
+
+
+def summary_cache_key(title: str, description: str, content: str) -> str:
+    """Build the summary cache key of an article.
+
+    Args:
+        title: Article title
+        description: Article description/excerpt
+        content: Full article content
+
+    Returns:
+        Hex SHA-256 digest of the model, prompt version and article text
+    """
+    return cache_key(
+        {
+            "model": GEMINI_MODEL,
+            "prompt_version": PROMPT_VERSION,
+            "title": title,
+            "description": description,
+            "content": content,
+        }
+    )
+
+
+def _build_prompt(source: str, title: str, description: str, content: str) -> str:
+    """Fill the summarization prompt with an article's details."""
+    return f"""
+{SUMMARY_INSTRUCTIONS}
+
+Article Details:
+- Source: {source}
+- Title: {title}
+- Description: {description}
+
+Full Content:
+{content}
+
+---
+Summary:
+"""
+
+
+def _build_batch_prompt(articles: Dict[str, pd.Series]) -> str:
+    """Fill the summarization prompt with several articles, each under its id."""
+    sections = [
+        f"""
+Article {article_id}:
+- Source: {row["source"]}
+- Title: {row["title"]}
+- Description: {row["description"]}
+
+Full Content:
+{row["content"]}
+
+---
+"""
+        for article_id, row in articles.items()
+    ]
+
+    return f"""
+{SUMMARY_INSTRUCTIONS.replace("the following article", "each of the following articles")}
+
+Summarize every article separately. Answer with a JSON array holding one \
+object per article, with the article's "id" and its "summary".
+{"".join(sections)}"""
+
+
+def _is_retryable(error: Exception) -> bool:
+    """Tell whether a failed Gemini call may succeed when repeated.
+
+    Client errors other than rate limiting (bad request, invalid key, blocked
+    content) fail the same way every time; everything else, including server
+    errors and timeouts, is retried.
+    """
+    return not isinstance(error, errors.ClientError) or error.code == 429
 
 
 def summarize_article_gemini(
@@ -29,11 +189,17 @@ def summarize_article_gemini(
     published_at: str,
     description: str,
     content: str,
+    rate_limiter: TokenBucket | None = None,
+    timeout: float = DEFAULT_SUMMARY_TIMEOUT,
+    max_retries: int = SUMMARY_MAX_RETRIES,
 ) -> str:
     """Generate an AI summary of an article using Google Gemini.
 
     Creates a concise summary focused on key takeaways for data startups,
-    including important metrics and statistics.
+    including important metrics and statistics. Summaries are cached on
+    disk by model, prompt version and article text, so an article is only
+    sent to Gemini once. Rate-limit, server and timeout errors are retried
+    with jittered exponential backoff; failed summaries are not cached.
 
     Args:
         source: Article source name
@@ -42,39 +208,268 @@ def summarize_article_gemini(
         published_at: Publication date (not currently used in prompt)
         description: Article description/excerpt
         content: Full article content
+        rate_limiter: Optional token bucket acquired before every attempt
+        timeout: Per-attempt timeout in seconds
+        max_retries: Number of retries after the first attempt
 
     Returns:
         AI-generated summary or default message if generation fails
     """
-    prompt = f"""
-Please summarize the following article concisely but thoroughly, with a focus on \
-the takeaways relevant to a data startup. Focus on three main points, preferably \
-with a detailed sentence for each. Sentences should be no longer than 20 words but \
-no shorter than 10. Try to include key metrics such as percentages, statistics, or \
-any numerical data of importance. Do not provide any additional commentary or \
-trailing newline characters.
+    cache = _get_summary_cache()
+    key = summary_cache_key(title, description, content)
 
-Article Details:
-- Source: {source}
-- Title: {title}
-- Description: {description}
+    if cache is not None:
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
 
-Full Content:
-{content}
+    prompt = _build_prompt(source, title, description, content)
+    config = types.GenerateContentConfig(
+        http_options=types.HttpOptions(timeout=int(timeout * 1000))
+    )
 
----
-Summary:
-"""
+    try:
+        text = _generate(prompt, config, rate_limiter, max_retries, f"'{title}'")
+    except Exception as e:
+        logger.error(f"Error summarizing article '{title}': {e}")
+        return DEFAULT_SUMMARY
+
+    if text is None:
+        logger.warning(f"No summary generated for article: {title}")
+        return DEFAULT_SUMMARY
+
+    summary = text.strip()
+    if cache is not None:
+        cache.set(key, summary)
+
+    return summary
+
+
+def _generate(
+    prompt: str,
+    config: types.GenerateContentConfig,
+    rate_limiter: TokenBucket | None,
+    max_retries: int,
+    label: str,
+) -> str | None:
+    """Call Gemini, retrying transient errors with jittered exponential backoff.
+
+    Args:
+        prompt: Prompt text
+        config: Generation config
+        rate_limiter: Optional token bucket acquired before every attempt
+        max_retries: Number of retries after the first attempt
+        label: Description of the request for log messages
+
+    Returns:
+        Response text, or None if the response has no text
+
+    Raises:
+        Exception: The last error, once it is not retryable or retries ran out
+    """
+    attempt = 0
+
+    while True:
+        if rate_limiter is not None:
+            rate_limiter.acquire()
+
+        try:
+            response = get_client().models.generate_content(
+                model=GEMINI_MODEL, contents=prompt, config=config
+            )
+            return response.text
+
+        except Exception as e:
+            if attempt >= max_retries or not _is_retryable(e):
+                raise
+
+            delay = backoff_delay(attempt, BACKOFF_BASE_SECONDS, BACKOFF_CAP_SECONDS)
+            logger.warning(
+                f"Summarizing {label} failed ({e}); "
+                f"retry {attempt + 1}/{max_retries} in {delay:.1f}s"
+            )
+            time.sleep(delay)
+            attempt += 1
+
+
+def _parse_batch_response(text: str | None, article_ids: List[str]) -> Dict[str, str]:
+    """Validate a batched JSON response and return its usable summaries.
 
+    Entries with an unknown id, a repeated id or an empty summary are
+    ignored, so their articles fall back to individual calls.
+    """
     try:
-        response = client.models.generate_content(model=GEMINI_MODEL, contents=prompt)
+        entries = json.loads(text or "")
+    except json.JSONDecodeError as e:
+        logger.warning(f"Batched summary response is not valid JSON: {e}")
+        return {}
+
+    if not isinstance(entries, list):
+        logger.warning("Batched summary response is not a JSON array")
+        return {}
+
+    summaries: Dict[str, str] = {}
+    for entry in entries:
+        if not isinstance(entry, dict):
+            continue
+
+        article_id, summary = entry.get("id"), entry.get("summary")
+        if (
+            article_id in article_ids
+            and article_id not in summaries
+            and isinstance(summary, str)
+            and summary.strip()
+        ):
+            summaries[article_id] = summary.strip()
+
+    return summaries
 
-        if response.text is None:
-            logger.warning(f"No summary generated for article: {title}")
-            return DEFAULT_SUMMARY
 
-        return response.text.strip()
+def summarize_batch_gemini(
+    articles: Dict[str, pd.Series],
+    rate_limiter: TokenBucket | None = None,
+    timeout: float = DEFAULT_SUMMARY_TIMEOUT,
+    max_retries: int = SUMMARY_MAX_RETRIES,
+) -> Dict[str, str]:
+    """Summarize several articles in one schema-constrained Gemini request.
 
+    Args:
+        articles: Mapping of article id to article row with 'source',
+            'title', 'description' and 'content'
+        rate_limiter: Optional token bucket acquired before every attempt
+        timeout: Per-attempt timeout in seconds
+        max_retries: Number of retries after the first attempt
+
+    Returns:
+        Mapping of article id to summary for the articles with a valid
+        summary in the response (empty if the request failed)
+    """
+    config = types.GenerateContentConfig(
+        response_mime_type="application/json",
+        response_schema=BATCH_RESPONSE_SCHEMA,
+        http_options=types.HttpOptions(timeout=int(timeout * 1000)),
+    )
+    label = f"a batch of {len(articles)} articles"
+
+    try:
+        text = _generate(
+            _build_batch_prompt(articles), config, rate_limiter, max_retries, label
+        )
     except Exception as e:
-        logger.error(f"Error summarizing article '{title}': {e}")
-        return DEFAULT_SUMMARY
+        logger.error(f"Error summarizing {label}: {e}")
+        return {}
+
+    return _parse_batch_response(text, list(articles))
+
+
+def summarize_articles(
+    df: pd.DataFrame,
+    workers: int = DEFAULT_SUMMARY_WORKERS,
+    requests_per_minute: float = DEFAULT_REQUESTS_PER_MINUTE,
+    timeout: float = DEFAULT_SUMMARY_TIMEOUT,
+    batch_size: int = DEFAULT_SUMMARY_BATCH_SIZE,
+    cache_only: bool = False,
+) -> List[str]:
+    """Summarize many articles with concurrent Gemini calls.
+
+    Calls run on a thread pool and share one requests-per-minute limiter,
+    so the total time is close to that of the slowest call as long as the
+    quota allows the calls to start together. Articles with a cached
+    summary are not sent to Gemini. With a batch size above one, the other
+    articles are packed into batched JSON requests, and articles missing
+    from a batch response are summarized one by one.
+
+    Args:
+        df: Articles with 'source', 'title', 'url', 'published_at',
+            'description' and 'content' columns
+        workers: Maximum number of calls in flight
+        requests_per_minute: Gemini request quota shared by all calls
+        timeout: Per-call timeout in seconds
+        batch_size: Number of articles per Gemini request
+        cache_only: Never call Gemini; articles without a cached summary get
+            DEFAULT_SUMMARY (used by offline replays)
+
+    Returns:
+        One summary per article, in the order of df
+
+    Raises:
+        RuntimeError: If Gemini is needed and GEMINI_API_KEY is not set
+    """
+    if df.empty:
+        return []
+
+    # A per-minute quota allows a burst within the minute, so up to one
+    # call per worker starts at once instead of being spaced 60 / rpm apart
+    rate_limiter = TokenBucket(
+        rate=requests_per_minute / 60,
+        capacity=max(1.0, min(requests_per_minute, workers)),
+    )
+    cache = _get_summary_cache()
+    rows = [row for _, row in df.iterrows()]
+    keys = [
+        summary_cache_key(row["title"], row["description"], row["content"])
+        for row in rows
+    ]
+    summaries: List[str | None] = [
+        cache.get(key) if cache is not None else None for key in keys
+    ]
+    pending = [i for i, summary in enumerate(summaries) if summary is None]
+    cached = len(rows) - len(pending)
+    start = time.perf_counter()
+
+    if cache_only:
+        logger.info(
+            f"Serving {cached} cached summaries; {len(pending)} articles without "
+            "one are not sent to Gemini"
+        )
+        return [summary or DEFAULT_SUMMARY for summary in summaries]
+
+    if pending:
+        # Fail fast on a missing key instead of retrying every article
+        get_client()
+
+    def summarize(i: int) -> str:
+        row = rows[i]
+        return summarize_article_gemini(
+            source=row["source"],
+            title=row["title"],
+            url=row["url"],
+            published_at=row["published_at"],
+            description=row["description"],
+            content=row["content"],
+            rate_limiter=rate_limiter,
+            timeout=timeout,
+        )
+
+    def summarize_batch(batch: List[int]) -> Dict[str, str]:
+        return summarize_batch_gemini(
+            {str(i): rows[i] for i in batch}, rate_limiter=rate_limiter, timeout=timeout
+        )
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        if batch_size > 1 and len(pending) > 1:
+            batches = list(chunk_list(pending, batch_size))
+            for batch_summaries in executor.map(summarize_batch, batches):
+                for article_id, summary in batch_summaries.items():
+                    summaries[int(article_id)] = summary
+                    if cache is not None:
+                        cache.set(keys[int(article_id)], summary)
+
+            missing = [i for i in pending if summaries[i] is None]
+            logger.info(
+                f"Summarized {len(pending) - len(missing)} articles in "
+                f"{len(batches)} batched requests; {len(missing)} fall back to "
+                "individual requests"
+            )
+            pending = missing
+
+        for i, summary in zip(pending, executor.map(summarize, pending)):
+            summaries[i] = summary
+
+    logger.info(
+        f"Summarized {len(summaries)} articles in {time.perf_counter() - start:.2f}s"
+    )
+    if cache is not None:
+        logger.info(f"Summary cache: {cached} hits, {len(rows) - cached} misses")
+
+    return summaries
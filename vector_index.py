@@ -0,0 +1,320 @@
+"""Inverted-file (IVF) vector index over the embeddings of archived articles.
+
+Normalized article embeddings are clustered with k-means; each article is
+stored in the list of its nearest centroid. A query only scans the lists of
+its ``nprobe`` nearest centroids, so lookups touch a small fraction of the
+archive. New archive partitions are embedded and appended on each update,
+and the centroids are retrained once the index has doubled in size. Vectors
+are never removed one by one; the index is rebuilt once archives expire.
+"""
+
+import logging
+import sqlite3
+from pathlib import Path
+from typing import List
+
+import numpy as np
+import pandas as pd
+
+from archive_store import list_partitions, read_partition
+from disk_cache import DEFAULT_CACHE_DIR
+from helper_functions import canonicalize_url
+from semantic_similarity import build_combined_text, embed_texts, model_id
+
+logger = logging.getLogger(__name__)
+
+# Constants
+VECTOR_INDEX_DIR = DEFAULT_CACHE_DIR / "vector_index"
+VECTORS_FILE = "vectors.f32"
+CENTROIDS_FILE = "centroids.npy"
+INDEXED_COLUMNS = ["source", "title", "url", "description", "fetched_from"]
+DEFAULT_NPROBE = 8
+DEFAULT_TOP_K = 10
+KMEANS_ITERATIONS = 10
+KMEANS_SAMPLE_SIZE = 20_000
+RETRAIN_GROWTH_FACTOR = 2.0
+RANDOM_SEED = 1
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    """Scale vectors to unit length so dot products are cosine similarities."""
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return (vectors / np.maximum(norms, 1e-12)).astype(np.float32)
+
+
+def train_centroids(vectors: np.ndarray, num_lists: int) -> np.ndarray:
+    """Cluster unit vectors with spherical k-means.
+
+    Args:
+        vectors: Unit vectors of shape (n, dim)
+        num_lists: Number of clusters
+
+    Returns:
+        Unit centroids of shape (num_lists, dim)
+    """
+    rng = np.random.RandomState(RANDOM_SEED)
+    if len(vectors) > KMEANS_SAMPLE_SIZE:
+        vectors = vectors[rng.choice(len(vectors), KMEANS_SAMPLE_SIZE, replace=False)]
+
+    centroids = vectors[rng.choice(len(vectors), num_lists, replace=False)]
+
+    for _ in range(KMEANS_ITERATIONS):
+        assignments = np.argmax(vectors @ centroids.T, axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assignments, vectors)
+
+        # Keep the previous centroid of clusters that lost all members
+        empty = ~np.bincount(assignments, minlength=num_lists).astype(bool)
+        sums[empty] = centroids[empty]
+        centroids = _normalize(sums)
+
+    return centroids
+
+
+class VectorIndex:
+    """IVF index of archived article embeddings, stored on disk.
+
+    Vectors live in an append-only float32 file; a SQLite table maps each
+    row to its article and list. The index is tied to the configured
+    embedding model and backend and is rebuilt when they change.
+    """
+
+    def __init__(self, directory: Path = VECTOR_INDEX_DIR) -> None:
+        """Open (or create) the vector index.
+
+        Args:
+            directory: Directory holding the vectors, centroids and metadata
+        """
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._vectors_path = self.directory / VECTORS_FILE
+        self._centroids_path = self.directory / CENTROIDS_FILE
+
+        self._conn = sqlite3.connect(self.directory / "index.sqlite")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS items (
+                row INTEGER PRIMARY KEY,
+                url_key TEXT NOT NULL UNIQUE,
+                url TEXT NOT NULL,
+                title TEXT NOT NULL,
+                source TEXT NOT NULL,
+                archive_date TEXT NOT NULL,
+                list_id INTEGER NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS items_list ON items (list_id);
+            CREATE TABLE IF NOT EXISTS indexed_partitions (
+                path TEXT PRIMARY KEY,
+                mtime REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS meta (
+                name TEXT PRIMARY KEY,
+                value TEXT NOT NULL
+            );
+            """
+        )
+        self._conn.commit()
+
+        self.centroids = (
+            np.load(self._centroids_path) if self._centroids_path.exists() else None
+        )
+
+    def _meta(self, name: str) -> str | None:
+        row = self._conn.execute(
+            "SELECT value FROM meta WHERE name = ?", (name,)
+        ).fetchone()
+        return row[0] if row else None
+
+    def _set_meta(self, name: str, value: str) -> None:
+        self._conn.execute("INSERT OR REPLACE INTO meta VALUES (?, ?)", (name, value))
+
+    def _matrix(self) -> np.memmap:
+        """Memory-map the vector file read-only."""
+        return np.memmap(self._vectors_path, dtype=np.float32, mode="r").reshape(
+            len(self), -1
+        )
+
+    def clear(self) -> None:
+        """Remove every vector, list and indexed partition."""
+        self._conn.executescript(
+            "DELETE FROM items; DELETE FROM indexed_partitions; DELETE FROM meta;"
+        )
+        self._conn.commit()
+        self._vectors_path.unlink(missing_ok=True)
+        self._centroids_path.unlink(missing_ok=True)
+        self.centroids = None
+
+    def update(self) -> int:
+        """Embed and add the articles of new or changed archive partitions.
+
+        Returns:
+            Number of articles added
+        """
+        if self._meta("model") not in (None, model_id()):
+            logger.info("Embedding model changed; rebuilding the vector index")
+            self.clear()
+
+        indexed = dict(self._conn.execute("SELECT path, mtime FROM indexed_partitions"))
+        batches = []
+        changed = []
+
+        for _, _, path in list_partitions("all_articles"):
+            mtime = path.stat().st_mtime
+            if indexed.get(str(path)) != mtime:
+                batches.append(
+                    read_partition("all_articles", path, columns=INDEXED_COLUMNS)
+                )
+                changed.append((str(path), mtime))
+
+        if not changed:
+            return 0
+
+        articles = pd.concat(batches, ignore_index=True)
+        articles["url_key"] = articles["url"].map(canonicalize_url)
+        known = {key for (key,) in self._conn.execute("SELECT url_key FROM items")}
+        articles = articles[~articles["url_key"].isin(known)].drop_duplicates(
+            subset="url_key", keep="last"
+        )
+
+        if not articles.empty:
+            self._add(articles)
+
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO indexed_partitions VALUES (?, ?)", changed
+        )
+        self._set_meta("model", model_id())
+        self._conn.commit()
+
+        logger.info(f"Added {len(articles)} archived articles to the vector index")
+        return len(articles)
+
+    def rebuild(self) -> int:
+        """Drop the whole index and re-index every archive partition.
+
+        Embeddings of articles indexed before come from the embedding store,
+        so only articles missing from it are encoded again.
+
+        Returns:
+            Number of articles indexed
+        """
+        self.clear()
+
+        return self.update()
+
+    def _add(self, articles: pd.DataFrame) -> None:
+        """Append the embeddings of new articles and assign them to lists."""
+        vectors = _normalize(embed_texts(build_combined_text(articles).tolist()))
+        first_row = len(self)
+
+        # Drop vectors left by an update that was interrupted before committing
+        with open(self._vectors_path, "ab") as f:
+            f.truncate(first_row * vectors.shape[1] * 4)
+            f.write(vectors.tobytes())
+
+        trained_size = int(self._meta("trained_size") or 0)
+        retrain = (
+            self.centroids is None
+            or first_row + len(vectors) >= trained_size * RETRAIN_GROWTH_FACTOR
+        )
+        list_ids = (
+            np.zeros(len(vectors), dtype=int)
+            if retrain
+            else np.argmax(vectors @ self.centroids.T, axis=1)
+        )
+
+        self._conn.executemany(
+            "INSERT INTO items VALUES (?, ?, ?, ?, ?, ?, ?)",
+            zip(
+                range(first_row, first_row + len(vectors)),
+                articles["url_key"],
+                articles["url"],
+                articles["title"].fillna(""),
+                articles["source"].astype(str),
+                articles["archive_date"].map(str),
+                list_ids.tolist(),
+            ),
+        )
+
+        if retrain:
+            self._retrain()
+
+    def _retrain(self) -> None:
+        """Retrain the centroids on every stored vector and reassign all lists."""
+        vectors = np.asarray(self._matrix())
+        num_lists = max(1, min(len(vectors), int(4 * np.sqrt(len(vectors)))))
+
+        self.centroids = train_centroids(vectors, num_lists)
+        np.save(self._centroids_path, self.centroids)
+
+        list_ids = np.argmax(vectors @ self.centroids.T, axis=1)
+        self._conn.executemany(
+            "UPDATE items SET list_id = ? WHERE row = ?",
+            zip(list_ids.tolist(), range(len(vectors))),
+        )
+        self._set_meta("trained_size", str(len(vectors)))
+        logger.info(f"Trained {num_lists} IVF lists on {len(vectors)} vectors")
+
+    def vector_for_url(self, url: str) -> np.ndarray | None:
+        """Return the stored unit embedding of an archived article, if any."""
+        row = self._conn.execute(
+            "SELECT row FROM items WHERE url_key = ?", (canonicalize_url(url),)
+        ).fetchone()
+
+        return None if row is None else np.asarray(self._matrix()[row[0]])
+
+    def search(
+        self,
+        vector: np.ndarray,
+        k: int = DEFAULT_TOP_K,
+        nprobe: int = DEFAULT_NPROBE,
+        exclude_urls: List[str] | None = None,
+    ) -> pd.DataFrame:
+        """Find the archived articles most similar to an embedding.
+
+        Args:
+            vector: Query embedding
+            k: Number of hits
+            nprobe: Number of nearest lists to scan
+            exclude_urls: Articles to leave out (e.g. the query article)
+
+        Returns:
+            DataFrame of hits, best first, with 'score', 'archive_date',
+            'source', 'title' and 'url' columns
+        """
+        columns = ["score", "archive_date", "source", "title", "url"]
+        if self.centroids is None or len(self) == 0:
+            return pd.DataFrame(columns=columns)
+
+        query = _normalize(np.asarray(vector, dtype=np.float32))
+        nprobe = min(nprobe, len(self.centroids))
+        probed = np.argpartition(-(self.centroids @ query), nprobe - 1)[:nprobe]
+
+        placeholders = ", ".join("?" * nprobe)
+        candidates = self._conn.execute(
+            "SELECT row, url_key FROM items "
+            f"WHERE list_id IN ({placeholders}) ORDER BY row",
+            probed.tolist(),
+        ).fetchall()
+
+        excluded = {canonicalize_url(url) for url in exclude_urls or []}
+        rows = np.array([row for row, key in candidates if key not in excluded])
+        if rows.size == 0:
+            return pd.DataFrame(columns=columns)
+
+        scores = np.asarray(self._matrix()[rows]) @ query
+        top = np.argpartition(-scores, min(k, len(rows)) - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+
+        hits = pd.read_sql_query(
+            "SELECT row, archive_date, source, title, url FROM items "
+            f"WHERE row IN ({', '.join('?' * len(top))})",
+            self._conn,
+            params=rows[top].tolist(),
+            index_col="row",
+        ).loc[rows[top]]
+        hits.insert(0, "score", scores[top])
+
+        return hits.reset_index(drop=True)
+
+    def __len__(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM items").fetchone()[0]